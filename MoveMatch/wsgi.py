@@ -1,16 +1,24 @@
-"""
-WSGI config for MoveMatch project.
-
-It exposes the WSGI callable as a module-level variable named ``application``.
-
-For more information on this file, see
-https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
-"""
-
-import os
-
-from django.core.wsgi import get_wsgi_application
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'MoveMatch.settings')
-
-application = get_wsgi_application()
+"""
+WSGI config for MoveMatch project.
+
+It exposes the WSGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/howto/deployment/wsgi/
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'MoveMatch.settings')
+
+application = get_wsgi_application()
+
+# Pose inference runs in this process unless analysis is farmed out to the
+# process pool, whose workers warm their own estimators.
+from django.conf import settings
+from video_analysis.estimator_pool import warm_estimators
+
+if not settings.ANALYSIS_PARALLEL:
+    warm_estimators()
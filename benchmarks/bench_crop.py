@@ -0,0 +1,63 @@
+"""Compare joint angles from person-cropped inference with full-frame inference.
+
+    python -m benchmarks.bench_crop [videos ...] [--target-fps 30]
+
+Runs MediaPipe twice per video (sample_input/*.mp4 by default), without the
+pose cache and without adaptive sampling, so both runs see the same frames.
+Cropping passes when, over frames detected in both runs, the 95th
+percentile angle difference is within ANGLE_TOLERANCE_DEG and the estimator
+is reset (the crop window moved) on at most MAX_RESET_RATE of the frames.
+"""
+import argparse
+import glob
+import os
+
+import numpy as np
+
+from video_analysis.angle_analysis import compute_angle_matrix
+from video_analysis.pose_extraction import extract_3d_poses
+from video_analysis.types import Joint
+
+SAMPLE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "sample_input")
+ANGLE_TOLERANCE_DEG = 5.0
+MAX_RESET_RATE = 0.05
+
+
+def compare(path, target_fps):
+    joints = list(Joint)
+    full = extract_3d_poses(path, use_cache=False, target_fps=target_fps, crop=False)
+    cropped = extract_3d_poses(path, use_cache=False, target_fps=target_fps, crop=True)
+    diff = np.abs(compute_angle_matrix(full, joints) - compute_angle_matrix(cropped, joints))
+    diff = diff[~np.isnan(diff)]
+    frames = max(len(cropped), 1)
+    return {
+        "frames": len(cropped),
+        "detected_full": int(full.detected.sum()),
+        "detected_crop": int(cropped.detected.sum()),
+        "median_diff": float(np.median(diff)) if diff.size else np.nan,
+        "p95_diff": float(np.percentile(diff, 95)) if diff.size else np.nan,
+        "reset_rate": cropped.metrics["crop_resets"] / frames,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("videos", nargs="*")
+    parser.add_argument("--target-fps", type=float, default=30)
+    args = parser.parse_args()
+
+    videos = args.videos or sorted(glob.glob(os.path.join(SAMPLE_DIR, "*.mp4")))
+    print(f"tolerance: p95 |diff| <= {ANGLE_TOLERANCE_DEG} deg, resets <= {MAX_RESET_RATE:.0%} of frames")
+    print(f"{'video':24} {'frames':>6} {'det full':>8} {'det crop':>8} {'median':>7} {'p95':>7} {'resets':>7}")
+    passed = True
+    for path in videos:
+        r = compare(path, args.target_fps)
+        ok = r["p95_diff"] <= ANGLE_TOLERANCE_DEG and r["reset_rate"] <= MAX_RESET_RATE
+        passed &= ok
+        print(f"{os.path.basename(path):24} {r['frames']:6d} {r['detected_full']:8d} {r['detected_crop']:8d} "
+              f"{r['median_diff']:7.2f} {r['p95_diff']:7.2f} {r['reset_rate']:7.1%}  {'ok' if ok else 'FAIL'}")
+    print("crop within tolerance" if passed else "crop NOT within tolerance; keep ANALYSIS_PERSON_CROP off")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Benchmark DTW alignment against the original scalar implementation.
+
+    python -m benchmarks.bench_dtw                 # angle series from sample_input/
+    python -m benchmarks.bench_dtw --synthetic 1800
+    python -m benchmarks.bench_dtw --synthetic 12000 --skip-legacy --memory
+
+The sample-video mode needs MediaPipe (poses come from the pose cache after
+the first run); ``--synthetic N`` uses two noisy, time-warped sine waves of
+about N frames instead. ``--memory`` runs the full-matrix and the
+checkpointed (linear-memory) aligner in fresh processes and reports each
+one's peak RSS and peak NumPy/Python allocation.
+"""
+import argparse
+import multiprocessing
+import resource
+import time
+import tracemalloc
+
+import numpy as np
+
+from video_analysis.time_alignment import (
+    accumulated_cost, backtrack, clean, compute_dtw_mapping, fast_dtw_mapping, linear_memory_path, z_normalize
+)
+
+SAMPLE_PAIRS = [
+    ("sample_input/dom-serve.mp4", "sample_input/federer-serve.mp4"),
+    ("sample_input/sid-run.mp4", "sample_input/dom-run.mp4"),
+    ("sample_input/blaise-forehand.mp4", "sample_input/federer-serve.mp4"),
+]
+
+
+def legacy_dtw_mapping(seq1, seq2):
+    # The original O(n*m) interpreted implementation
+    x = z_normalize(clean(seq1))
+    y = z_normalize(clean(seq2))
+    n, m = len(x), len(y)
+    cost = np.full((n + 1, m + 1), np.inf)
+    cost[0, :] = 0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            dist = abs(x[i - 1] - y[j - 1])
+            cost[i, j] = dist + min(cost[i - 1, j], cost[i, j - 1], cost[i - 1, j - 1])
+    end_j = int(np.argmin(cost[-1]))
+    path = []
+    i, j = n, end_j
+    while i > 0 and j > 0:
+        path.append((int(i - 1), int(j - 1)))
+        moves = [(i - 1, j), (i, j - 1), (i - 1, j - 1)]
+        costs = [cost[mv] if mv[0] >= 0 and mv[1] >= 0 else np.inf for mv in moves]
+        i, j = moves[np.argmin(costs)]
+    path.reverse()
+    return path
+
+
+def synthetic_pairs(n_frames, seed=0):
+    rng = np.random.default_rng(seed)
+    t1 = np.linspace(0, 4 * np.pi, n_frames)
+    t2 = np.linspace(0, 4 * np.pi, int(n_frames * 1.2)) ** 1.1 / (4 * np.pi) ** 0.1
+    seq1 = 90 + 40 * np.sin(t1) + rng.normal(0, 3, t1.size)
+    seq2 = 95 + 35 * np.sin(t2) + rng.normal(0, 3, t2.size)
+    seq1[rng.random(t1.size) < 0.03] = np.nan
+    return [("synthetic", seq1.tolist(), seq2.tolist())]
+
+
+def sample_video_pairs(joint):
+    from video_analysis.angle_analysis import compute_joint_angles
+    from video_analysis.pose_extraction import extract_3d_poses
+
+    pairs = []
+    for user_path, comp_path in SAMPLE_PAIRS:
+        user = compute_joint_angles(extract_3d_poses(user_path), [joint])[joint]
+        comp = compute_joint_angles(extract_3d_poses(comp_path), [joint])[joint]
+        pairs.append((f"{user_path} vs {comp_path}", user, comp))
+    return pairs
+
+
+def path_cost(seq1, seq2, path):
+    x, y = z_normalize(clean(seq1)), z_normalize(clean(seq2))
+    rows, cols = np.asarray(path).T
+    return float(np.abs(x[rows] - y[cols]).sum())
+
+
+def full_matrix_path(x, y):
+    cost = accumulated_cost(x, y)
+    return backtrack(cost, int(np.argmin(cost[-1])))
+
+
+def reset_peak_rss():
+    # ru_maxrss survives fork/exec, so reset the high-water mark where Linux allows it
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def peak_rss_bytes():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # KiB on Linux
+
+
+def measure_memory(aligner, seq1, seq2):
+    # Runs in a fresh process so the peak belongs to this aligner alone
+    x, y = z_normalize(clean(seq1)), z_normalize(clean(seq2))
+    reset_peak_rss()
+    tracemalloc.start()
+    start = time.perf_counter()
+    path = aligner(x, y)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    peak_rss = peak_rss_bytes()
+    return elapsed, peak, peak_rss, path
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--synthetic", type=int, metavar="FRAMES")
+    parser.add_argument("--joint", default="right_elbow")
+    parser.add_argument("--skip-legacy", action="store_true", help="do not run the scalar loop")
+    parser.add_argument("--band", type=int, metavar="FRAMES", help="also time a Sakoe-Chiba band")
+    parser.add_argument("--itakura", action="store_true", help="also time the Itakura parallelogram")
+    parser.add_argument("--fast", type=int, metavar="RADIUS", help="also time multiresolution DTW")
+    parser.add_argument("--base-cells", type=int, default=250_000, help="exact size for --fast")
+    parser.add_argument("--memory", action="store_true", help="peak memory of full vs linear-memory DTW")
+    args = parser.parse_args()
+
+    pairs = synthetic_pairs(args.synthetic) if args.synthetic else sample_video_pairs(args.joint)
+    for name, seq1, seq2 in pairs:
+        print(f"{name}: {len(seq1)} x {len(seq2)} frames")
+        new_time, path = timed(compute_dtw_mapping, seq1, seq2)
+        print(f"  vectorized {new_time * 1e3:10.1f} ms")
+        if not args.skip_legacy:
+            old_time, expected = timed(legacy_dtw_mapping, seq1, seq2)
+            same = "same path" if path == expected else "PATH DIFFERS"
+            print(f"  legacy     {old_time * 1e3:10.1f} ms  ({old_time / new_time:.0f}x, {same})")
+        if args.band is not None:
+            band_time, _ = timed(compute_dtw_mapping, seq1, seq2, "sakoe_chiba", args.band)
+            print(f"  band {args.band:<5} {band_time * 1e3:10.1f} ms")
+        if args.itakura:
+            itakura_time, _ = timed(compute_dtw_mapping, seq1, seq2, "itakura")
+            print(f"  itakura    {itakura_time * 1e3:10.1f} ms")
+        if args.fast is not None:
+            fast_time, fast_path = timed(fast_dtw_mapping, seq1, seq2, args.fast, args.base_cells)
+            error = path_cost(seq1, seq2, fast_path) / path_cost(seq1, seq2, path) - 1
+            print(f"  fast r={args.fast:<4}{fast_time * 1e3:10.1f} ms  (cost {error:+.2%} vs exact)")
+        if args.memory:
+            paths = {}
+            context = multiprocessing.get_context("spawn")
+            for name, aligner in (("full", full_matrix_path), ("linear", linear_memory_path)):
+                with context.Pool(1) as pool:
+                    elapsed, peak, peak_rss, paths[name] = pool.apply(measure_memory, (aligner, seq1, seq2))
+                print(f"  {name:<10} {elapsed * 1e3:10.1f} ms  peak alloc {peak / 2**20:8.1f} MiB  "
+                      f"peak RSS {peak_rss / 2**20:8.1f} MiB")
+            cost_full, cost_linear = (path_cost(seq1, seq2, paths[k]) for k in ("full", "linear"))
+            print(f"  linear-memory path cost {cost_linear - cost_full:+.2e} vs full matrix")
+
+
+if __name__ == "__main__":
+    main()
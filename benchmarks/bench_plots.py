@@ -0,0 +1,121 @@
+"""Benchmark rendering the per-run analysis plots.
+
+    python -m benchmarks.bench_plots --joints 3 --frames 300 --runs 5
+
+"legacy" is the original pyplot path: a new figure (with tight_layout) for
+each of the raw, aligned and DTW plots of every joint. "renderer" draws the
+same PNGs with the preallocated figures of ``PlotRenderer``; "renderer +
+summary" adds the combined multi-panel image. This is the cost of rendering
+every plot of a run. ``run_analysis`` itself now draws only the raw plots,
+and ``run_plot`` renders the others, the summary included, on first request.
+Timings are per run, after one warm-up run.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+
+from video_analysis.plotting import PlotRenderer
+from video_analysis.smoothing import moving_average
+
+
+def smooth_angles(data, window=15):
+    arr = np.array([x if x is not None else np.nan for x in data])
+    if np.all(np.isnan(arr)):
+        return [0] * len(arr)
+    arr[np.isnan(arr)] = np.nanmean(arr)
+    return np.convolve(arr, np.ones(window) / window, mode='same').tolist()
+
+
+def legacy_plot_joint_angles(user, comp, path, title=""):
+    plt.figure(figsize=(10, 4))
+    plt.plot(smooth_angles(user), label="User", color='blue')
+    plt.plot(smooth_angles(comp), label="Comparison", color='green')
+    plt.title(title)
+    plt.xlabel("Frame")
+    plt.ylabel("Angle (°)")
+    plt.legend()
+    plt.grid()
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+
+
+def legacy_plot_dtw_mapping(path, output_path):
+    x, y = zip(*path)
+    plt.figure(figsize=(6, 6))
+    plt.plot(x, y, color="purple")
+    plt.xlabel("User Frame")
+    plt.ylabel("Pro Frame")
+    plt.title("DTW Alignment Path")
+    plt.grid()
+    plt.savefig(output_path)
+    plt.close()
+
+
+def synthetic_run(joints, frames, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 4 * np.pi, frames)
+    panels = []
+    for k in range(joints):
+        user = (90 + 40 * np.sin(t + k) + rng.normal(0, 3, frames)).tolist()
+        comp = (95 + 35 * np.sin(t + k + 0.3) + rng.normal(0, 3, frames)).tolist()
+        panels.append((f"Joint {k}", user, comp, user))
+    path = [(i, min(frames - 1, int(i * 1.1))) for i in range(frames)]
+    return panels, path
+
+
+def legacy(panels, path, out):
+    for k, (label, user, comp, aligned) in enumerate(panels):
+        legacy_plot_joint_angles(user, comp, os.path.join(out, f"{k}_raw.png"), f"{label} (Raw)")
+        legacy_plot_joint_angles(aligned, comp, os.path.join(out, f"{k}_aligned.png"), f"{label} (Aligned)")
+        legacy_plot_dtw_mapping(path, os.path.join(out, f"{k}_dtw.png"))
+
+
+def reused(renderer, panels, path, out, summary=False):
+    # The pipeline smooths each series once and hands the result to every plot
+    panels = [(label, moving_average(user), moving_average(comp), moving_average(aligned))
+              for label, user, comp, aligned in panels]
+    renderer.render_dtw_mapping(path, os.path.join(out, "dtw.png"))
+    for k, (label, user, comp, aligned) in enumerate(panels):
+        renderer.render_joint_angles(user, comp, os.path.join(out, f"{k}_raw.png"), f"{label} (Raw)")
+        renderer.render_joint_angles(aligned, comp, os.path.join(out, f"{k}_aligned.png"), f"{label} (Aligned)")
+    if summary:
+        renderer.render_summary(panels, path, os.path.join(out, "summary.png"))
+
+
+def per_run(fn, runs):
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--joints", type=int, default=3)
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    panels, path = synthetic_run(args.joints, args.frames)
+    renderer = PlotRenderer()
+    with tempfile.TemporaryDirectory() as out:
+        old = per_run(lambda: legacy(panels, path, out), args.runs)
+        new = per_run(lambda: reused(renderer, panels, path, out), args.runs)
+        combined = per_run(lambda: reused(renderer, panels, path, out, summary=True), args.runs)
+
+    print(f"{args.joints} joints x {args.frames} frames, per run:")
+    print(f"  legacy             {old * 1e3:8.1f} ms  ({3 * args.joints} figures)")
+    print(f"  renderer           {new * 1e3:8.1f} ms  ({old / new:.1f}x)")
+    print(f"  renderer + summary {combined * 1e3:8.1f} ms  ({old / combined:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from django.contrib import admin
-from .models import ReferenceVideo
-
+from django.contrib import admin
+from .models import ReferenceVideo
+
 admin.site.register(ReferenceVideo)
\ No newline at end of file
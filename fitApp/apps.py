@@ -1,6 +1,9 @@
-from django.apps import AppConfig
-
-
-class FitappConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'fitApp'
+from django.apps import AppConfig
+
+
+class FitappConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'fitApp'
+
+    def ready(self):
+        from fitApp import signals  # noqa: F401
@@ -0,0 +1,91 @@
+"""Athlete library envelopes, built outside the request that searches them.
+
+A ``ReferenceVideo`` gets its search envelope when it is saved (see
+``signals``) or from ``manage.py precompute_envelopes``. The best-match
+search only reads envelopes that already exist and queues any missing one.
+"""
+import logging
+import threading
+
+from django.conf import settings
+
+from video_analysis.library_search import cached_envelope, reference_envelope
+from video_analysis.sports import ALL_SPORTS
+
+logger = logging.getLogger(__name__)
+
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def analysis_options():
+    """Pose extraction and smoothing options for every analysis.
+
+    The library search and ``run_analysis`` both take these, so a clip is
+    inferred once, shares one pose cache entry and is smoothed the same way.
+    """
+    return {
+        "target_fps": settings.ANALYSIS_TARGET_FPS,
+        "adaptive": settings.ANALYSIS_ADAPTIVE_SAMPLING,
+        "crop": settings.ANALYSIS_PERSON_CROP,
+        "parallel": settings.ANALYSIS_PARALLEL,
+        "chunk_seconds": settings.ANALYSIS_CHUNK_SECONDS,
+        "smoothing": settings.ANALYSIS_SMOOTHING,
+    }
+
+
+def reference_joints(reference):
+    """Joints of the technique ``reference`` shows, or None for an unknown technique."""
+    sport = ALL_SPORTS.get(reference.sport)
+    technique = next((t for t in sport.techniques if t.key == reference.technique), None) if sport else None
+    return technique.joints if technique else None
+
+
+def build_envelopes(references):
+    """Compute and cache the envelope of every reference that lacks one."""
+    options = analysis_options()
+    for reference in references:
+        joints = reference_joints(reference)
+        if joints:
+            reference_envelope(reference.video.path, joints, **options)
+
+
+def _build_pending(references):
+    try:
+        for reference in references:
+            try:
+                build_envelopes([reference])
+            except Exception:
+                logger.exception("Envelope for %s failed", reference)
+    finally:
+        with _pending_lock:
+            _pending.difference_update(reference.pk for reference in references)
+
+
+def schedule_envelopes(references):
+    """Build envelopes in a background thread; references already queued are skipped."""
+    with _pending_lock:
+        queued = [reference for reference in references if reference.pk not in _pending]
+        _pending.update(reference.pk for reference in queued)
+    if queued:
+        threading.Thread(target=_build_pending, args=(queued,), daemon=True).start()
+
+
+def library_envelopes(references, joints):
+    """``(reference, envelope)`` for every reference whose envelope is ready.
+
+    Missing envelopes are scheduled, not computed here, so a search request
+    never runs pose inference on library clips.
+    """
+    options = analysis_options()
+    ready, missing = [], []
+    for reference in references:
+        envelope = cached_envelope(reference.video.path, joints, **options)
+        if envelope is None:
+            missing.append(reference)
+        else:
+            ready.append((reference, envelope))
+    if missing:
+        logger.info("Library envelopes not ready yet: %s", ", ".join(map(str, missing)))
+        schedule_envelopes(missing)
+    return ready
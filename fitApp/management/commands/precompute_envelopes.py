@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from fitApp.library import build_envelopes
+from fitApp.models import ReferenceVideo
+
+
+class Command(BaseCommand):
+    help = "Build the best-match search envelope of every athlete library video that lacks one."
+
+    def handle(self, *args, **options):
+        references = list(ReferenceVideo.objects.all())
+        build_envelopes(references)
+        self.stdout.write(f"Envelopes ready for {len(references)} library videos.")
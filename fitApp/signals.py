@@ -0,0 +1,11 @@
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from fitApp.library import schedule_envelopes
+from fitApp.models import ReferenceVideo
+
+
+@receiver(post_save, sender=ReferenceVideo)
+def build_reference_envelope(sender, instance, **kwargs):
+    transaction.on_commit(lambda: schedule_envelopes([instance]))
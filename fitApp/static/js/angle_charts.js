@@ -0,0 +1,65 @@
+// Draws a run's joint angle and DTW charts from its series JSON
+// (see video_analysis/series.py). Each .angle-charts element names its
+// endpoint in data-series-url, and in data-plot-url the PNG export URL with
+// NAME in place of the plot name.
+Chart.defaults.color = '#e0e0e0';
+Chart.defaults.borderColor = 'rgba(255, 255, 255, 0.1)';
+
+function points(line) {
+  return line.x.map((x, i) => ({ x: x, y: line.y[i] }));
+}
+
+function dataset(label, line, color) {
+  return { label: label, data: points(line), borderColor: color, showLine: true, pointRadius: 0, borderWidth: 1.5 };
+}
+
+function exportLink(container, plot, text) {
+  const link = document.createElement('a');
+  link.className = 'chart-export';
+  link.href = container.dataset.plotUrl.replace('NAME', plot);
+  link.textContent = text;
+  return link;
+}
+
+function addChart(container, title, datasets, xLabel, yLabel, plot, wide) {
+  const box = document.createElement('div');
+  box.className = wide ? 'chart-box chart-wide' : 'chart-box';
+  const canvas = document.createElement('canvas');
+  box.appendChild(canvas);
+  box.appendChild(exportLink(container, plot, 'PNG'));
+  container.appendChild(box);
+  new Chart(canvas, {
+    type: 'scatter',
+    data: { datasets: datasets },
+    options: {
+      animation: false,
+      spanGaps: false,
+      plugins: { title: { display: true, text: title }, legend: { display: datasets.length > 1 } },
+      scales: {
+        x: { title: { display: true, text: xLabel } },
+        y: { title: { display: true, text: yLabel } },
+      },
+    },
+  });
+}
+
+document.querySelectorAll('.angle-charts').forEach(async (container) => {
+  const response = await fetch(container.dataset.seriesUrl);
+  if (!response.ok) {
+    return;
+  }
+  const series = await response.json();
+  for (const joint of series.joints) {
+    addChart(container, `${joint.label} (Raw)`,
+      [dataset('User', joint.user, 'blue'), dataset('Comparison', joint.comp, 'green')], 'Frame', 'Angle (°)',
+      `${joint.key}_raw`);
+    addChart(container, `${joint.label} (Aligned)`,
+      [dataset('User', joint.aligned, 'blue'), dataset('Comparison', joint.comp, 'green')], 'Frame', 'Angle (°)',
+      `${joint.key}_aligned`);
+  }
+  addChart(container, 'DTW Alignment Path', [dataset('Path', series.dtw, 'purple')], 'User Frame', 'Pro Frame',
+    'dtw', true);
+  const summary = exportLink(container, 'summary', 'Download all plots as one PNG');
+  summary.classList.add('chart-wide');
+  container.appendChild(summary);
+});
@@ -1,3 +1,673 @@
-from django.test import TestCase
-
-# Create your tests here.
+import errno
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth.models import User
+from django.http import Http404
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from video_analysis import cache, media_ingest, time_alignment
+from video_analysis.angle_analysis import calculate_angle, compute_angle_matrix
+from video_analysis.cache import DiskCache, TieredCache, file_digest
+from video_analysis.estimator_pool import EstimatorPool
+from video_analysis.joints import JointRegistry
+from video_analysis.library_search import ReferenceEnvelope, envelope, find_best_match
+from video_analysis.online_alignment import OnlineDTW, series_stats
+from video_analysis.smoothing import moving_average, one_euro, savitzky_golay, smooth, smoothing_factor
+from video_analysis.sports import Sport, Technique
+from video_analysis.time_alignment import (
+    accumulated_cost, clean, common_rate, compute_dtw_mapping, constraint_window, dtw_path, fast_dtw_path,
+    linear_memory_path, prepare_angle_matrix, remap_multiple_by_dtw, remap_sequence_by_dtw, to_uniform_time_base,
+    z_normalize
+)
+from video_analysis.types import JOINT_LABELS, JOINT_LANDMARKS, Joint, PoseSequence
+
+
+def legacy_cost(x, y):
+    # The original scalar fill, cell by cell
+    n, m = len(x), len(y)
+    cost = np.full((n + 1, m + 1), np.inf)
+    cost[0, :] = 0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            dist = abs(x[i - 1] - y[j - 1])
+            cost[i, j] = dist + min(cost[i - 1, j], cost[i, j - 1], cost[i - 1, j - 1])
+    return cost
+
+
+def legacy_dtw_mapping(seq1, seq2):
+    x = z_normalize(clean(seq1))
+    y = z_normalize(clean(seq2))
+    cost = legacy_cost(x, y)
+    path = []
+    i, j = len(x), int(np.argmin(cost[-1]))
+    while i > 0 and j > 0:
+        path.append((int(i - 1), int(j - 1)))
+        moves = [(i - 1, j), (i, j - 1), (i - 1, j - 1)]
+        i, j = moves[int(np.argmin([cost[move] for move in moves]))]
+    path.reverse()
+    return path
+
+
+def warped_pair(n, m, seed, gaps=0.03):
+    """Two noisy, time-warped sine waves, the first with missing samples."""
+    rng = np.random.default_rng(seed)
+    t1 = np.linspace(0, 4 * np.pi, n)
+    t2 = np.linspace(0, 4 * np.pi, m) ** 1.1 / (4 * np.pi) ** 0.1
+    seq1 = 90 + 40 * np.sin(t1) + rng.normal(0, 3, n)
+    seq2 = 95 + 35 * np.sin(t2) + rng.normal(0, 3, m)
+    seq1[rng.random(n) < gaps] = np.nan
+    return seq1.tolist(), seq2.tolist()
+
+
+class VectorizedDTWTests(SimpleTestCase):
+    def test_cost_matrix_matches_scalar_fill(self):
+        for seed in range(5):
+            seq1, seq2 = warped_pair(40 + seed * 7, 55 - seed * 3, seed)
+            x, y = z_normalize(clean(seq1)), z_normalize(clean(seq2))
+            np.testing.assert_array_equal(accumulated_cost(x, y), legacy_cost(x, y))
+
+    def test_path_matches_legacy_loop(self):
+        for seed in range(10):
+            seq1, seq2 = warped_pair(30 + 5 * seed, 70 - 3 * seed, seed)
+            self.assertEqual(compute_dtw_mapping(seq1, seq2), legacy_dtw_mapping(seq1, seq2))
+
+
+class ConstrainedDTWTests(SimpleTestCase):
+    def assertInsideWindow(self, path, lo, hi):
+        for i, j in path:
+            self.assertTrue(lo[i + 1] <= j + 1 < hi[i + 1], (i, j))
+
+    def test_band_paths_stay_inside_their_windows(self):
+        for constraint in ("sakoe_chiba", "itakura"):
+            for seed in range(5):
+                seq1, seq2 = warped_pair(60 + 4 * seed, 70 - 2 * seed, seed, gaps=0)
+                lo, hi = constraint_window(len(seq1), len(seq2), constraint, band_width=5)
+                path = compute_dtw_mapping(seq1, seq2, constraint=constraint, band_width=5)
+                self.assertEqual(path[-1][0], len(seq1) - 1)
+                self.assertInsideWindow(path, lo, hi)
+
+    def test_dtw_path_forwards_the_constraint(self):
+        rng = np.random.default_rng(0)
+        x, y = rng.normal(size=(50, 3)), rng.normal(size=(64, 3))
+        for constraint in ("sakoe_chiba", "itakura"):
+            lo, hi = constraint_window(len(x), len(y), constraint, band_width=4)
+            path = dtw_path(x, y, use_cache=False, constraint=constraint, band_width=4)
+            self.assertInsideWindow(path, lo, hi)
+
+    def test_unbounded_band_matches_full_matrix(self):
+        seq1, seq2 = warped_pair(40, 52, 3)
+        self.assertEqual(compute_dtw_mapping(seq1, seq2, constraint="sakoe_chiba", band_width=100),
+                         compute_dtw_mapping(seq1, seq2))
+
+
+def path_cost(x, y, path):
+    return sum(float(np.sum(np.abs(x[i] - y[j]))) for i, j in path)
+
+
+class LinearMemoryDTWTests(SimpleTestCase):
+    def test_path_cost_equals_full_matrix_cost(self):
+        rng = np.random.default_rng(1)
+        seq1, seq2 = warped_pair(90, 120, 1)
+        cases = [
+            (z_normalize(clean(seq1)), z_normalize(clean(seq2))),
+            (rng.normal(size=(75, 4)), rng.normal(size=(60, 4))),
+        ]
+        for x, y in cases:
+            best = accumulated_cost(x, y)[-1].min()
+            for step in (None, 1, 7, len(x)):
+                path = linear_memory_path(x, y, step)
+                self.assertEqual(path[-1][0], len(x) - 1)
+                self.assertAlmostEqual(path_cost(x, y, path), best, places=6)
+
+
+def legacy_remap_sequence_by_dtw(mapping, seq, target_len):
+    # The original per-frame lists
+    remap = {j: [] for j in range(target_len)}
+    for i, j in mapping:
+        if seq[i] is not None:
+            remap[j].append(seq[i])
+    return [float(np.nanmean(remap[j])) if remap[j] else None for j in range(target_len)]
+
+
+class RemapTests(SimpleTestCase):
+    def assertSeriesEqual(self, actual, expected):
+        self.assertEqual([v is None for v in actual], [v is None for v in expected])
+        np.testing.assert_allclose([v for v in actual if v is not None],
+                                   [v for v in expected if v is not None], rtol=1e-12)
+
+    def test_bincount_remap_matches_legacy_remap(self):
+        rng = np.random.default_rng(2)
+        seq1, seq2 = warped_pair(80, 100, 2, gaps=0)
+        mapping = compute_dtw_mapping(seq1, seq2)
+        # Extra target frames nothing maps onto must stay None
+        target_len = len(seq2) + 5
+        angles = {}
+        for joint in ("knee", "hip", "elbow"):
+            series = rng.normal(90, 20, len(seq1))
+            angles[joint] = [None if missing else float(v) for v, missing in zip(series, rng.random(len(seq1)) < 0.2)]
+        angles["elbow"][:10] = [None] * 10
+        remapped = remap_multiple_by_dtw(mapping, angles, target_len)
+        for joint, series in angles.items():
+            expected = legacy_remap_sequence_by_dtw(mapping, series, target_len)
+            self.assertSeriesEqual(remap_sequence_by_dtw(mapping, series, target_len), expected)
+            self.assertSeriesEqual(remapped[joint], expected)
+
+
+def brute_force_band_dtw(query, candidate, radius):
+    # Pinned DTW over the Sakoe-Chiba band, cell by cell
+    n = len(query)
+    cost = np.full((n + 1, n + 1), np.inf)
+    cost[0, 0] = 0
+    for i in range(1, n + 1):
+        for j in range(max(1, i - radius), min(n, i + radius) + 1):
+            dist = np.abs(query[i - 1] - candidate[j - 1]).sum()
+            cost[i, j] = dist + min(cost[i - 1, j], cost[i, j - 1], cost[i - 1, j - 1])
+    return cost[n, n]
+
+
+class LibrarySearchTests(SimpleTestCase):
+    def test_best_match_agrees_with_brute_force(self):
+        rng = np.random.default_rng(4)
+        radius = 3
+        library = []
+        for k in range(4):
+            t = np.cumsum(rng.uniform(0.5, 1.5, int(rng.integers(40, 70)))) / 10
+            series = np.stack([np.sin(t * (k + 1)), np.cos(t * 0.7 * (k + 1))], axis=1).astype(np.float32)
+            library.append((k, ReferenceEnvelope(series, *envelope(series, radius), 30.0)))
+        query = library[2][1].series[12:32] + rng.normal(0, 0.2, (20, 2)).astype(np.float32)
+
+        match = find_best_match(query, library, radius)
+        best = min(
+            (brute_force_band_dtw(query, ref.series[start:start + len(query)], radius), key, start)
+            for key, ref in library
+            for start in range(len(ref.series) - len(query) + 1)
+        )
+        self.assertAlmostEqual(match.distance, best[0], places=4)
+        self.assertEqual((match.reference, match.start_frame), best[1:])
+        self.assertAlmostEqual(match.start_time, best[2] / 30.0)
+
+
+class OnlineDTWTests(SimpleTestCase):
+    def test_complete_stream_matches_offline_dtw(self):
+        for seed in range(3):
+            seq1, seq2 = warped_pair(50 + 10 * seed, 70, seed)
+            x, y = z_normalize(clean(seq1)), z_normalize(clean(seq2))
+            aligner = OnlineDTW(y, *series_stats(seq1))
+            positions = aligner.extend(np.array(seq1, dtype=np.float32))
+            cost = accumulated_cost(x, y)
+            np.testing.assert_array_equal(positions, np.argmin(cost[1:], axis=1) - 1)
+            self.assertAlmostEqual(aligner.cost, cost[-1].min(), places=3)
+            self.assertEqual(aligner.path(), compute_dtw_mapping(seq1, seq2))
+
+    def test_joint_stream_matches_offline_dtw(self):
+        user = dict(zip(("knee", "hip"), warped_pair(60, 60, 5)))
+        comp = dict(zip(("knee", "hip"), warped_pair(80, 80, 6)))
+        joints = list(user)
+        stats = {joint: series_stats(user[joint]) for joint in joints}
+        aligner = OnlineDTW.for_joints(comp, joints, stats)
+        aligner.extend(np.array([user[joint] for joint in joints], dtype=np.float32).T)
+        x, y = prepare_angle_matrix(user, joints), prepare_angle_matrix(comp, joints)
+        self.assertAlmostEqual(aligner.cost, accumulated_cost(x, y)[-1].min(), places=3)
+        self.assertEqual(aligner.path(), dtw_path(x, y, use_cache=False))
+
+
+class FakeEstimator:
+    def reset(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class FlakyPool(EstimatorPool):
+    """Pool whose first ``failures`` estimator builds raise."""
+
+    def __init__(self, failures, **kwargs):
+        super().__init__(**kwargs)
+        self.failures = failures
+
+    def _create(self, key):
+        if self.failures:
+            self.failures -= 1
+            raise MemoryError("model load failed")
+        return FakeEstimator()
+
+
+class EstimatorPoolTests(SimpleTestCase):
+    def test_failed_create_frees_its_slot(self):
+        pool = FlakyPool(failures=1, size=1, checkout_timeout=0.1)
+        with self.assertRaises(MemoryError):
+            with pool.checkout():
+                pass
+        with pool.checkout() as lease:
+            self.assertIsInstance(lease.estimator, FakeEstimator)
+        self.assertEqual(pool.metrics()["size"], 1)
+
+    def test_failed_warm_frees_its_slot(self):
+        pool = FlakyPool(failures=1, size=1, checkout_timeout=0.1)
+        with self.assertRaises(MemoryError):
+            pool.warm()
+        pool.warm()
+        self.assertEqual(pool.metrics()["idle"], 1)
+
+    def test_checkout_times_out_when_every_estimator_is_busy(self):
+        pool = FlakyPool(failures=0, size=1, checkout_timeout=0.05)
+        with pool.checkout():
+            with self.assertRaises(TimeoutError):
+                with pool.checkout():
+                    pass
+
+
+class UniformTimeBaseTests(SimpleTestCase):
+    def test_grid_is_not_finer_than_the_clips(self):
+        clip_30 = np.arange(65) / 30
+        clip_60 = np.arange(130) / 60
+        self.assertAlmostEqual(common_rate(60, clip_30, clip_60), 30)
+        self.assertAlmostEqual(common_rate(24, clip_30, clip_60), 24)
+        self.assertIsNone(common_rate(None, clip_30))
+        angles = {"knee": list(np.linspace(0, 90, 65))}
+        self.assertEqual(len(to_uniform_time_base(clip_30, angles, common_rate(60, clip_30))["knee"]), 65)
+        resampled = to_uniform_time_base(clip_60, {"knee": list(np.linspace(0, 90, 130))}, common_rate(60, clip_30))
+        self.assertEqual(len(resampled["knee"]), 65)
+
+    def test_variable_frame_rate_without_target_uses_median_step(self):
+        rng = np.random.default_rng(7)
+        times = np.cumsum(np.where(rng.random(90) < 0.7, 1 / 30, 1 / 15))
+        angles = {"knee": list(np.sin(times))}
+        resampled = to_uniform_time_base(times, angles)["knee"]
+        self.assertEqual(len(resampled), int(np.floor((times[-1] - times[0]) * 30 + 1e-6)) + 1)
+        grid = times[0] + np.arange(len(resampled)) / 30
+        np.testing.assert_allclose(resampled, np.interp(grid, times, np.sin(times)))
+
+
+def legacy_joint_angles(poses, joints):
+    # The per-frame loop: one calculate_angle call per frame and joint
+    angles = np.full((len(poses), len(joints)), np.nan)
+    for f, frame in enumerate(poses):
+        for k, joint in enumerate(joints):
+            pts = [frame.pose.keypoints[i] for i in Joint(joint).landmark_indices]
+            if all(pts):
+                angles[f, k] = calculate_angle(*pts)
+    return angles
+
+
+class AngleMatrixTests(SimpleTestCase):
+    def test_matches_per_frame_loop(self):
+        rng = np.random.default_rng(8)
+        landmarks = rng.random((200, 33, 4), dtype=np.float32)
+        detected = rng.random(200) > 0.1
+        landmarks[5, 14, 0] = np.nan  # a missing coordinate in a detected frame
+        detected[5] = True
+        landmarks[6, 13] = landmarks[6, 11]  # a zero-length limb
+        detected[6] = True
+        poses = PoseSequence(landmarks, detected, np.arange(200) / 30)
+        joints = list(Joint)
+
+        matrix = compute_angle_matrix(poses, joints)
+        expected = legacy_joint_angles(poses, joints)
+        np.testing.assert_allclose(matrix, expected, rtol=1e-5, atol=1e-4, equal_nan=True)
+        self.assertTrue(np.isnan(matrix[~detected]).all())
+        self.assertTrue(np.isnan(matrix[5]).any() and np.isnan(matrix[6]).any())
+
+    def test_unknown_joint_is_nan(self):
+        poses = PoseSequence(np.random.default_rng(0).random((4, 33, 4), dtype=np.float32), np.ones(4, bool),
+                             np.arange(4) / 30)
+        matrix = compute_angle_matrix(poses, [Joint.RIGHT_KNEE, "tail"])
+        self.assertFalse(np.isnan(matrix[:, 0]).any())
+        self.assertTrue(np.isnan(matrix[:, 1]).all())
+
+
+class JointRegistryTests(SimpleTestCase):
+    def sports(self, *joints):
+        return {"test": Sport("test", "Test", [Technique("move", "Move", list(joints))])}
+
+    def test_validate_accepts_defined_joints(self):
+        JointRegistry(JOINT_LANDMARKS, JOINT_LABELS).validate(self.sports(Joint.RIGHT_KNEE, Joint.LEFT_KNEE))
+
+    def test_validate_rejects_duplicate_joints(self):
+        registry = JointRegistry(JOINT_LANDMARKS, JOINT_LABELS)
+        with self.assertRaisesRegex(ValueError, "Duplicate joints in test/move"):
+            registry.validate(self.sports(Joint.RIGHT_KNEE, Joint.RIGHT_KNEE))
+
+    def test_validate_rejects_undefined_joints(self):
+        landmarks = {key: value for key, value in JOINT_LANDMARKS.items() if key != Joint.LEFT_KNEE.value}
+        registry = JointRegistry(landmarks, JOINT_LABELS)
+        with self.assertRaisesRegex(ValueError, "no definition: left_knee"):
+            registry.validate(self.sports(Joint.RIGHT_KNEE, Joint.LEFT_KNEE))
+
+    def test_validate_rejects_bad_landmark_triples(self):
+        for triple in ([11, 11, 13], [11, 13, 40]):
+            registry = JointRegistry({**JOINT_LANDMARKS, Joint.RIGHT_KNEE.value: triple}, JOINT_LABELS)
+            with self.assertRaisesRegex(ValueError, "Invalid landmark triple for right_knee"):
+                registry.validate(self.sports(Joint.RIGHT_KNEE))
+
+
+class TempDirMixin:
+    def setUp(self):
+        super().setUp()
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+
+
+class FileDigestTests(TempDirMixin, SimpleTestCase):
+    def test_hardlinked_copy_hits_the_memo(self):
+        src = os.path.join(self.tmp, "clip.mp4")
+        with open(src, "wb") as f:
+            f.write(b"frames" * 1000)
+        digest = file_digest(src)
+        entries = len(cache._digest_memo)
+        copy = os.path.join(self.tmp, "run", "clip.mp4")
+        os.makedirs(os.path.dirname(copy))
+        os.link(src, copy)
+        self.assertEqual(file_digest(copy), digest)
+        self.assertEqual(len(cache._digest_memo), entries)
+
+    def test_rewritten_file_gets_a_new_digest(self):
+        path = os.path.join(self.tmp, "clip.mp4")
+        with open(path, "wb") as f:
+            f.write(b"a" * 100)
+        first = file_digest(path)
+        with open(path, "wb") as f:
+            f.write(b"b" * 200)
+        self.assertNotEqual(file_digest(path), first)
+
+
+class DiskCacheTests(TempDirMixin, SimpleTestCase):
+    def arrays(self, value):
+        return {"x": np.full(100, value, dtype=np.float64)}
+
+    def test_evicts_least_recently_used(self):
+        disk = DiskCache(self.tmp, 1 << 30)
+        disk.store_arrays("aa", self.arrays(1))
+        disk.store_arrays("bb", self.arrays(2))
+        size = os.path.getsize(disk.path_for("aa"))
+        os.utime(disk.path_for("aa"), ns=(1_000_000_000, 1_000_000_000))
+        os.utime(disk.path_for("bb"), ns=(2_000_000_000, 2_000_000_000))
+        disk.load_arrays("aa")  # now the most recently used
+        disk.max_bytes = 2 * size + size // 2
+        disk.store_arrays("cc", self.arrays(3))
+        self.assertIsNotNone(disk.load_arrays("aa"))
+        self.assertIsNone(disk.load_arrays("bb"))
+        self.assertIsNotNone(disk.load_arrays("cc"))
+        self.assertEqual(disk.stats(), {"hits": 3, "misses": 1, "evictions": 1})
+
+    def test_truncated_entry_is_a_miss(self):
+        disk = DiskCache(self.tmp, 1 << 30)
+        disk.store_arrays("aa", self.arrays(1))
+        path = disk.path_for("aa")
+        with open(path, "rb") as f:
+            data = f.read()
+        for corrupt in (data[:len(data) // 2], b"", b"not a zip file"):
+            with open(path, "wb") as f:
+                f.write(corrupt)
+            self.assertIsNone(disk.load_arrays("aa"))
+        self.assertEqual(disk.stats()["misses"], 3)
+        disk.store_arrays("aa", self.arrays(1))
+        np.testing.assert_array_equal(disk.load_arrays("aa")["x"], self.arrays(1)["x"])
+
+    def test_bytes_round_trip(self):
+        disk = DiskCache(self.tmp, 1 << 30)
+        self.assertIsNone(disk.load_bytes("aa", ".png"))
+        disk.store_bytes("aa", b"png", ".png")
+        self.assertEqual(disk.load_bytes("aa", ".png"), b"png")
+        self.assertEqual(disk.stats(), {"hits": 1, "misses": 1, "evictions": 0})
+
+
+class TieredCacheTests(TempDirMixin, SimpleTestCase):
+    def test_memory_lru_in_front_of_disk(self):
+        tiered = TieredCache(DiskCache(self.tmp, 1 << 30), max_entries=1)
+        tiered.store_arrays("aa", {"x": np.arange(3)})
+        tiered.store_arrays("bb", {"x": np.arange(4)})
+        self.assertEqual(len(tiered.load_arrays("bb")["x"]), 4)  # memory
+        self.assertEqual(len(tiered.load_arrays("aa")["x"]), 3)  # evicted from memory, read from disk
+        self.assertEqual(len(tiered.load_arrays("aa")["x"]), 3)  # promoted back into memory
+        self.assertIsNone(tiered.load_arrays("cc"))
+        stats = tiered.stats()
+        self.assertEqual((stats["memory_hits"], stats["hits"], stats["misses"]), (2, 1, 1))
+        self.assertEqual(stats["memory_entries"], 1)
+
+
+def gappy_series(n, seed):
+    """A noisy curve with scattered NaNs, a long gap and a NaN at each end."""
+    rng = np.random.default_rng(seed)
+    x = 90 + 30 * np.sin(np.linspace(0, 6, n)) + rng.normal(0, 2, n)
+    x[rng.random(n) < 0.1] = np.nan
+    x[40:70] = np.nan
+    x[0] = x[-1] = np.nan
+    return x
+
+
+def brute_moving_average(x, window):
+    half = window // 2
+    out = np.full(len(x), np.nan)
+    for i in range(len(x)):
+        values = x[max(0, i - half):i + half + 1]
+        if (~np.isnan(values)).any():
+            out[i] = np.nanmean(values)
+    return out
+
+
+def brute_savitzky_golay(x, window, order):
+    half, n = window // 2, len(x)
+    frames = np.arange(n)
+    valid = ~np.isnan(x)
+    filled = np.interp(frames, frames[valid], x[valid])
+    out = np.empty(n)
+    for i in range(n):
+        start = min(max(i - half, 0), n - window)
+        coeffs = np.polyfit(np.arange(window), filled[start:start + window], order)
+        out[i] = np.polyval(coeffs, i - start)
+    for i in range(n):
+        if not valid[max(0, i - half):i + half + 1].any():
+            out[i] = np.nan
+    return out
+
+
+def brute_one_euro(x, rate, min_cutoff, beta, d_cutoff):
+    out = np.full(len(x), np.nan)
+    value, speed, elapsed = None, 0.0, 1
+    for i, sample in enumerate(x):
+        if np.isnan(sample):
+            elapsed += 1
+            continue
+        dt = elapsed / rate
+        raw_speed = 0.0 if value is None else (sample - value) / dt
+        speed += smoothing_factor(d_cutoff, dt) * (raw_speed - speed)
+        if value is None:
+            value = sample
+        else:
+            value += smoothing_factor(min_cutoff + beta * abs(speed), dt) * (sample - value)
+        out[i] = value
+        elapsed = 1
+    return out
+
+
+class SmoothingTests(SimpleTestCase):
+    def test_moving_average_matches_brute_force(self):
+        x = gappy_series(120, 0)
+        for window in (3, 15, 31):
+            out = moving_average(x, window)
+            np.testing.assert_allclose(out, brute_moving_average(x, window), equal_nan=True)
+        # The 30-frame gap outlasts the window, so its middle stays NaN. The
+        # NaN end samples are filled from their shrunken windows.
+        out = moving_average(x, 15)
+        self.assertTrue(np.isnan(out[47:63]).all())
+        self.assertFalse(np.isnan(out[[0, 46, 63, -1]]).any())
+
+    def test_savitzky_golay_matches_brute_force(self):
+        x = gappy_series(120, 1)
+        for window, order in ((15, 2), (9, 3), (31, 2)):
+            out = savitzky_golay(x, window, order)
+            np.testing.assert_allclose(out, brute_savitzky_golay(x, window, order), rtol=1e-8, atol=1e-6,
+                                       equal_nan=True)
+
+    def test_one_euro_matches_brute_force(self):
+        x = gappy_series(120, 2)
+        out = one_euro(x, 30.0, 1.0, 0.05, 1.0)
+        np.testing.assert_allclose(out, brute_one_euro(x, 30.0, 1.0, 0.05, 1.0), equal_nan=True)
+        np.testing.assert_array_equal(np.isnan(out), np.isnan(x))
+
+    def test_all_nan_input_stays_nan(self):
+        x = np.full((40, 2), np.nan)
+        for method in ("moving_average", "savitzky_golay", "one_euro"):
+            self.assertTrue(np.isnan(smooth(x, method, 30.0)).all(), method)
+
+    def test_columns_are_smoothed_independently(self):
+        m = np.stack([gappy_series(80, 3), gappy_series(80, 4)], axis=1)
+        for method in ("moving_average", "savitzky_golay", "one_euro"):
+            out = smooth(m, method, 30.0)
+            for k in range(2):
+                np.testing.assert_allclose(out[:, k], smooth(m[:, k], method, 30.0), equal_nan=True)
+
+
+# The multiresolution fallback may cost at most this much more than exact DTW
+FASTDTW_MAX_COST_RATIO = 1.05
+
+
+class DTWPathTests(TempDirMixin, SimpleTestCase):
+    def test_repeated_call_hits_the_cache(self):
+        tiered = TieredCache(DiskCache(self.tmp, 1 << 30), max_entries=4)
+        rng = np.random.default_rng(9)
+        x, y = rng.normal(size=(60, 3)), rng.normal(size=(70, 3))
+        with mock.patch.object(time_alignment, "dtw_cache", tiered):
+            first = dtw_path(x, y)
+            self.assertEqual(tiered.stats()["misses"], 1)
+            self.assertEqual(dtw_path(x, y), first)
+            self.assertEqual(tiered.stats()["memory_hits"], 1)
+            tiered._entries.clear()
+            self.assertEqual(dtw_path(x, y), first)
+            self.assertEqual(tiered.stats()["hits"], 1)
+            # Other parameters are another entry
+            dtw_path(x, y, constraint="sakoe_chiba", band_width=5)
+            self.assertEqual(tiered.stats()["misses"], 2)
+        self.assertEqual(first, dtw_path(x, y, use_cache=False))
+
+    def test_fast_dtw_stays_close_to_exact_cost(self):
+        for seed in range(4):
+            seq1, seq2 = warped_pair(600, 720, seed)
+            x, y = z_normalize(clean(seq1)), z_normalize(clean(seq2))
+            best = accumulated_cost(x, y)[-1].min()
+            paths = [fast_dtw_path(x, y, 5, base_cells=10_000)]
+            # The fallback dtw_path picks past the exact and linear-memory limits
+            with mock.patch.object(time_alignment, "LINEAR_DTW_MAX_CELLS", 0):
+                paths.append(dtw_path(x, y, max_cells=10_000, use_cache=False))
+            for path in paths:
+                self.assertEqual(path[-1][0], len(x) - 1)
+                ratio = path_cost(x, y, path) / best
+                self.assertGreaterEqual(ratio, 1 - 1e-9)
+                self.assertLessEqual(ratio, FASTDTW_MAX_COST_RATIO)
+
+
+class StoredRun:
+    """Stands in for an ``AnalysisRun``; the views only read ``results_dir``."""
+    results_dir = "runs/1"
+
+
+class RunResultViewTests(TempDirMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(User.objects.create_user("athlete", password="pw"))
+        media = override_settings(MEDIA_ROOT=self.tmp)
+        media.enable()
+        self.addCleanup(media.disable)
+        lookup = mock.patch("fitApp.views.get_object_or_404", return_value=StoredRun())
+        self.get_run = lookup.start()
+        self.addCleanup(lookup.stop)
+        os.makedirs(os.path.join(self.tmp, StoredRun.results_dir))
+        self.series = {"joints": [{"key": "right_knee", "user": {"x": list(range(300)), "y": [90.0] * 300}}]}
+        with open(os.path.join(self.tmp, StoredRun.results_dir, "series.json"), "w") as f:
+            json.dump(self.series, f)
+
+    def test_series_etag_round_trip(self):
+        url = reverse("run_series", args=[1])
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content), self.series)
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("max-age=", response["Cache-Control"])
+        etag = response["ETag"]
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+
+    def test_series_gzip_negotiation(self):
+        url = reverse("run_series", args=[1])
+        plain = self.client.get(url)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        compressed = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(compressed["Content-Encoding"], "gzip")
+        self.assertIn("Accept-Encoding", compressed["Vary"])
+        self.assertEqual(gzip.decompress(compressed.content), plain.content)
+
+    def test_series_404s(self):
+        os.remove(os.path.join(self.tmp, StoredRun.results_dir, "series.json"))
+        self.assertEqual(self.client.get(reverse("run_series", args=[1])).status_code, 404)
+        self.get_run.side_effect = Http404
+        self.assertEqual(self.client.get(reverse("run_series", args=[2])).status_code, 404)
+
+    def test_plot_is_served_with_cache_headers(self):
+        with mock.patch("fitApp.views.render_run_plot", return_value=b"\x89PNG") as render:
+            response = self.client.get(reverse("run_plot", args=[1, "right_knee_raw"]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "image/png")
+        self.assertEqual(response.content, b"\x89PNG")
+        self.assertIn("private", response["Cache-Control"])
+        render.assert_called_once_with(os.path.join(self.tmp, StoredRun.results_dir), "right_knee_raw")
+
+    def test_plot_404s(self):
+        url = reverse("run_plot", args=[1, "nonsense"])
+        for error in (KeyError("nonsense"), FileNotFoundError()):
+            with mock.patch("fitApp.views.render_run_plot", side_effect=error):
+                self.assertEqual(self.client.get(url).status_code, 404)
+        self.get_run.side_effect = Http404
+        self.assertEqual(self.client.get(reverse("run_plot", args=[2, "dtw"])).status_code, 404)
+
+    def test_results_need_a_login(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse("run_series", args=[1])).status_code, 302)
+        self.assertEqual(self.client.get(reverse("run_plot", args=[1, "dtw"])).status_code, 302)
+
+
+def cross_device_link(src, dst):
+    raise OSError(errno.EXDEV, os.strerror(errno.EXDEV))
+
+
+class LinkOrCopyTests(TempDirMixin, SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.src = os.path.join(self.tmp, "upload.mp4")
+        self.data = os.urandom(256 * 1024)
+        with open(self.src, "wb") as f:
+            f.write(self.data)
+
+    def assertCopied(self, dst):
+        with open(dst, "rb") as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_hardlink_first(self):
+        dst = os.path.join(self.tmp, "run.mp4")
+        self.assertEqual(media_ingest.link_or_copy(self.src, dst), "hardlink")
+        self.assertTrue(os.path.samefile(self.src, dst))
+
+    def test_cross_device_falls_back_to_reflink_or_copy(self):
+        dst = os.path.join(self.tmp, "run.mp4")
+        with mock.patch("os.link", cross_device_link):
+            how = media_ingest.link_or_copy(self.src, dst)
+        self.assertIn(how, ("reflink", "copy"))
+        self.assertFalse(os.path.samefile(self.src, dst))
+        self.assertCopied(dst)
+
+    def test_copy_when_reflink_is_unsupported(self):
+        dst = os.path.join(self.tmp, "run.mp4")
+        unsupported = OSError(errno.EOPNOTSUPP, os.strerror(errno.EOPNOTSUPP))
+        with mock.patch("os.link", cross_device_link), \
+                mock.patch.object(media_ingest, "reflink", side_effect=unsupported):
+            self.assertEqual(media_ingest.link_or_copy(self.src, dst), "copy")
+        self.assertCopied(dst)
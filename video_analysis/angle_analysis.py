@@ -1,34 +1,53 @@
-import numpy as np
-from video_analysis.types import Point3D
-
-JOINT_MAP = {
-    'left_elbow': [11, 13, 15],
-    'right_elbow': [12, 14, 16],
-    'left_knee': [23, 25, 27],
-    'right_knee': [24, 26, 28],
-    'left_hip': [11, 23, 25],
-    'right_hip': [12, 24, 26],
-    'left_shoulder': [13, 11, 23],
-    'right_shoulder': [14, 12, 24],
-}
-
-def calculate_angle(a, b, c):
-    a_vec = np.array([a.x - b.x, a.y - b.y, a.z - b.z])
-    c_vec = np.array([c.x - b.x, c.y - b.y, c.z - b.z])
-    dot = np.dot(a_vec, c_vec)
-    norm = np.linalg.norm(a_vec) * np.linalg.norm(c_vec)
-    return float('nan') if norm == 0 else np.degrees(np.arccos(np.clip(dot / norm, -1.0, 1.0)))
-
-def compute_joint_angles(frames, joints):
-    angles = {joint: [] for joint in joints}
-    for frame in frames:
-        keypoints = frame.pose.keypoints
-        for joint in joints:
-            if joint in JOINT_MAP:
-                i1, i2, i3 = JOINT_MAP[joint]
-                pts = [keypoints[i] for i in (i1, i2, i3)]
-                angle = calculate_angle(*pts) if all(pts) else None
-                angles[joint].append(angle)
-            else:
-                angles[joint].append(None)
-    return angles
+import numpy as np
+from video_analysis.joints import JOINTS
+from video_analysis.types import PoseSequence
+
+def calculate_angle(a, b, c):
+    a_vec = np.array([a.x - b.x, a.y - b.y, a.z - b.z])
+    c_vec = np.array([c.x - b.x, c.y - b.y, c.z - b.z])
+    dot = np.dot(a_vec, c_vec)
+    norm = np.linalg.norm(a_vec) * np.linalg.norm(c_vec)
+    return float('nan') if norm == 0 else np.degrees(np.arccos(np.clip(dot / norm, -1.0, 1.0)))
+
+def compute_angle_matrix(poses, joints):
+    """Angles in degrees for every frame and joint, as a ``(frames, joints)`` array.
+
+    All landmark triples are gathered from the joint registry with one fancy
+    index, so the cost is a handful of array operations regardless of video
+    length. Frames without a detection, joints without a definition and
+    degenerate (zero-length) limbs are NaN.
+    """
+    rows = JOINTS.rows(joints)
+    known = rows >= 0
+    triples = JOINTS.triples[np.where(known, rows, 0)]
+    pts = poses.xyz[:, triples].astype(np.float64)  # (frames, joints, 3, xyz)
+    a_vec = pts[:, :, 0] - pts[:, :, 1]
+    c_vec = pts[:, :, 2] - pts[:, :, 1]
+    dot = np.einsum('fjk,fjk->fj', a_vec, c_vec)
+    norm = np.linalg.norm(a_vec, axis=-1) * np.linalg.norm(c_vec, axis=-1)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        angles = np.degrees(np.arccos(np.clip(dot / norm, -1.0, 1.0)))
+    angles[norm == 0] = np.nan
+    angles[~poses.detected] = np.nan
+    angles[:, ~known] = np.nan
+    return angles
+
+def angle_matrix_to_series(angles, joints):
+    return {
+        joint: [None if np.isnan(v) else float(v) for v in angles[:, k]]
+        for k, joint in enumerate(joints)
+    }
+
+def compute_joint_angles(frames, joints):
+    poses = frames if isinstance(frames, PoseSequence) else PoseSequence.from_frames(frames)
+    return angle_matrix_to_series(compute_angle_matrix(poses, joints), joints)
+
+def iter_joint_angles(pose_blocks, joints):
+    """Compute angles block by block from a pose stream.
+
+    Yields ``(times, angles)`` per block, where ``angles`` has the same shape
+    as ``compute_joint_angles``' result. Nothing is accumulated, so breaking
+    out of the loop stops the upstream extraction as well.
+    """
+    for block in pose_blocks:
+        yield block.times, compute_joint_angles(block, joints)
@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import threading
+import uuid
+import zipfile
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+# Digests remembered per process; the server hashes every upload, so keep an LRU
+DIGEST_MEMO_ENTRIES = 1024
+
+_digest_memo: "OrderedDict[tuple, str]" = OrderedDict()
+_digest_lock = threading.Lock()
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file's contents, memoized on (device, inode, size, mtime).
+
+    Keying on the inode rather than the path lets the hardlinked copies a run
+    makes of its inputs hit the memo.
+    """
+    st = os.stat(path)
+    memo_key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    with _digest_lock:
+        if memo_key in _digest_memo:
+            _digest_memo.move_to_end(memo_key)
+            return _digest_memo[memo_key]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    digest = h.hexdigest()
+    with _digest_lock:
+        _digest_memo[memo_key] = digest
+        while len(_digest_memo) > DIGEST_MEMO_ENTRIES:
+            _digest_memo.popitem(last=False)
+    return digest
+
+
+def make_key(*parts) -> str:
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def array_digest(*arrays: np.ndarray) -> str:
+    """SHA-256 over the dtype, shape and contents of each array."""
+    h = hashlib.sha256()
+    for arr in arrays:
+        arr = np.ascontiguousarray(arr)
+        h.update(f"{arr.dtype.str}{arr.shape}".encode("utf-8"))
+        h.update(arr.data)
+    return h.hexdigest()
+
+
+class DiskCache:
+    """Directory of cached blobs with a byte cap and least-recently-used eviction.
+
+    Recency is tracked through file mtimes, so the ordering survives restarts
+    and is shared by every process pointing at the same directory.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str, suffix: str = ".npz") -> str:
+        return os.path.join(self.directory, key[:2], key + suffix)
+
+    def load_arrays(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        path = self.path_for(key)
+        try:
+            with np.load(path) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError, EOFError, zipfile.BadZipFile):
+            # Missing, or truncated by a crash mid-write: recompute
+            self._count(hit=False)
+            return None
+        self._touch(path)
+        self._count(hit=True)
+        return arrays
+
+    def store_arrays(self, key: str, arrays: Dict[str, np.ndarray]) -> None:
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def load_bytes(self, key: str, suffix: str) -> Optional[bytes]:
+        path = self.path_for(key, suffix)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self._count(hit=False)
+            return None
+        self._touch(path)
+        self._count(hit=True)
+        return data
+
+    def store_bytes(self, key: str, data: bytes, suffix: str) -> None:
+        path = self.path_for(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith(".tmp"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            with self._lock:
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
+
+    def _touch(self, path: str) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+
+class TieredCache:
+    """Bounded in-memory LRU in front of a ``DiskCache``.
+
+    Same ``load_arrays``/``store_arrays`` interface. Memory hits skip disk
+    entirely. Disk hits are promoted into memory. Entries are shared per
+    process, so callers must not modify the arrays they get back.
+    """
+
+    def __init__(self, disk: DiskCache, max_entries: int):
+        self.disk = disk
+        self.max_entries = max_entries
+        self.memory_hits = 0
+        self._entries: "OrderedDict[str, Dict[str, np.ndarray]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def load_arrays(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        with self._lock:
+            arrays = self._entries.get(key)
+            if arrays is not None:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return arrays
+        arrays = self.disk.load_arrays(key)
+        if arrays is not None:
+            self._remember(key, arrays)
+        return arrays
+
+    def store_arrays(self, key: str, arrays: Dict[str, np.ndarray]) -> None:
+        self._remember(key, arrays)
+        self.disk.store_arrays(key, arrays)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            memory = {"memory_hits": self.memory_hits, "memory_entries": len(self._entries)}
+        return {**memory, **self.disk.stats()}
+
+    def _remember(self, key: str, arrays: Dict[str, np.ndarray]) -> None:
+        with self._lock:
+            self._entries[key] = arrays
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
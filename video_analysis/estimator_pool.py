@@ -0,0 +1,151 @@
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import mediapipe as mp
+import numpy as np
+
+# Estimators kept per (complexity, static_image_mode) in each process.
+ESTIMATORS_PER_KEY = 2
+# A checkout that waits this long for a busy estimator gives up
+CHECKOUT_TIMEOUT_SECONDS = 600
+
+
+@dataclass
+class Lease:
+    estimator: object
+    wait_seconds: float = 0.0
+    cold_start_seconds: float = 0.0  # non-zero when no warm estimator was available
+
+
+class EstimatorPool:
+    """Process-wide pool of initialised MediaPipe pose graphs.
+
+    Building a ``Pose`` graph loads the model and sets up the calculator
+    graph, which costs noticeable time per video. Estimators are checked out
+    for one video at a time and ``reset()`` on return so no tracking state
+    leaks into the next video.
+    """
+
+    def __init__(self, size=ESTIMATORS_PER_KEY, checkout_timeout=CHECKOUT_TIMEOUT_SECONDS):
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self._idle = {}
+        self._created = {}
+        self._lock = threading.Lock()
+        self.warmup_seconds = 0.0
+        self.checkouts = 0
+        self.checkout_wait_seconds = 0.0
+
+    def warm(self, model_complexity=2, static_image_mode=False, count=1):
+        key = (model_complexity, static_image_mode)
+        idle = self._idle_queue(key)
+        for _ in range(count):
+            if not self._reserve(key):
+                break
+            idle.put(self._create_reserved(key))
+
+    @contextmanager
+    def checkout(self, model_complexity=2, static_image_mode=False):
+        key = (model_complexity, static_image_mode)
+        idle = self._idle_queue(key)
+        start = time.perf_counter()
+        cold_start = 0.0
+        try:
+            estimator = idle.get_nowait()
+        except queue.Empty:
+            if self._reserve(key):
+                estimator = self._create_reserved(key)
+                cold_start = time.perf_counter() - start
+            else:
+                try:
+                    estimator = idle.get(timeout=self.checkout_timeout)
+                except queue.Empty:
+                    raise TimeoutError(f"No pose estimator became free within {self.checkout_timeout} s") from None
+        wait = time.perf_counter() - start - cold_start
+        with self._lock:
+            self.checkouts += 1
+            self.checkout_wait_seconds += wait
+
+        healthy = True
+        try:
+            yield Lease(estimator, wait, cold_start)
+        except Exception:
+            healthy = False
+            raise
+        finally:
+            # A graph that raised may be in a bad state; drop it rather than
+            # hand it out again. Early exits (e.g. a closed generator) keep it.
+            if healthy:
+                estimator.reset()
+                idle.put(estimator)
+            else:
+                estimator.close()
+                self._release(key)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "size": sum(self._created.values()),
+                "idle": sum(q.qsize() for q in self._idle.values()),
+                "warmup_seconds": self.warmup_seconds,
+                "checkouts": self.checkouts,
+                "checkout_wait_seconds": self.checkout_wait_seconds,
+            }
+
+    def _idle_queue(self, key):
+        with self._lock:
+            return self._idle.setdefault(key, queue.LifoQueue())
+
+    def _reserve(self, key):
+        with self._lock:
+            if self._created.get(key, 0) >= self.size:
+                return False
+            self._created[key] = self._created.get(key, 0) + 1
+            return True
+
+    def _release(self, key):
+        with self._lock:
+            self._created[key] -= 1
+
+    def _create_reserved(self, key):
+        """``_create`` for a slot already taken by ``_reserve``; frees the slot if creation fails."""
+        try:
+            return self._create(key)
+        except BaseException:
+            self._release(key)
+            raise
+
+    def _create(self, key):
+        model_complexity, static_image_mode = key
+        start = time.perf_counter()
+        estimator = mp.solutions.pose.Pose(static_image_mode=static_image_mode, model_complexity=model_complexity)
+        # The first process() call loads the model weights; pay for it here
+        estimator.process(np.zeros((256, 256, 3), dtype=np.uint8))
+        estimator.reset()
+        with self._lock:
+            self.warmup_seconds += time.perf_counter() - start
+        return estimator
+
+
+estimator_pool = EstimatorPool()
+
+LEASE_METRICS = ("estimator_checkouts", "estimator_warm_checkouts", "estimator_wait_seconds",
+                 "estimator_cold_start_seconds")
+
+
+def lease_metrics(*extraction_metrics):
+    """Estimator use summed over a run's extractions, wherever they ran.
+
+    Each extraction (or chunk) reports its own lease, so this stays right
+    when inference happens in pool workers, whose ``EstimatorPool`` is not
+    the one in this process. Cached extractions (``None``) used no estimator.
+    """
+    measured = [m for m in extraction_metrics if m]
+    return {key: sum(m.get(key, 0) for m in measured) for key in LEASE_METRICS}
+
+
+def warm_estimators(model_complexity=2, count=1):
+    estimator_pool.warm(model_complexity, static_image_mode=False, count=count)
@@ -0,0 +1,183 @@
+import queue
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+import cv2
+import numpy as np
+
+FRAME_QUEUE_SIZE = 8
+
+# Adaptive sampling: a frame counts as high-motion when the mean absolute
+# grey-level change (0-255) from the previous thumbnail exceeds this multiple
+# of its running average, and is at least ADAPTIVE_MIN_MOTION.
+ADAPTIVE_MOTION_RATIO = 1.25
+ADAPTIVE_MIN_MOTION = 0.5
+MOTION_THUMBNAIL_SIZE = (64, 36)
+
+_END = object()
+
+
+@dataclass
+class PipelineStats:
+    frames: int = 0
+    skipped: int = 0
+    # Decoder waited for a free buffer: inference is the bottleneck.
+    decode_stalls: int = 0
+    decode_stall_seconds: float = 0.0
+    # Inference waited for a decoded frame: decoding is the bottleneck.
+    inference_stalls: int = 0
+    inference_stall_seconds: float = 0.0
+
+    def as_dict(self):
+        return asdict(self)
+
+
+class FramePipeline:
+    """Decode and colour-convert frames on a background thread.
+
+    Iterating yields ``(frame_index, time_sec, image)`` tuples. Images live
+    in a small pool of preallocated buffers that is recycled as the consumer
+    advances, so each array is only valid until the next iteration.
+
+    Only every ``stride``-th frame (counted from the start of the video) is
+    yielded; the rest are grabbed without decoding. With ``adaptive`` every
+    frame is decoded to measure motion and high-motion frames are yielded
+    as well, so the stride only applies to quiet stretches.
+
+    With ``convert=False`` frames are decoded straight into the pool buffers
+    and yielded as BGR, for consumers that crop before converting.
+    """
+
+    def __init__(self, cap, start_frame=0, stop_frame=None, stride=1, adaptive=False,
+                 convert=True, queue_size=FRAME_QUEUE_SIZE):
+        self.cap = cap
+        self.start_frame = start_frame
+        self.stop_frame = stop_frame
+        self.stride = max(1, stride)
+        self.adaptive = adaptive
+        self.convert = convert
+        self.stats = PipelineStats()
+        self._frames = queue.Queue(maxsize=queue_size)
+        self._free = queue.Queue()
+        self._max_buffers = queue_size + 1  # the queue plus the frame being processed
+        self._allocated = 0
+        self._shape = None
+        self._stop = threading.Event()
+        self._error = None
+        self._thread = threading.Thread(target=self._decode, daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        return False
+
+    def __iter__(self):
+        while True:
+            start = time.perf_counter()
+            stalled = self._frames.empty()
+            item = self._frames.get()
+            if stalled:
+                self.stats.inference_stalls += 1
+                self.stats.inference_stall_seconds += time.perf_counter() - start
+            if item is _END:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item
+            self.stats.frames += 1
+            self._free.put(item[2])
+
+    def _decode(self):
+        try:
+            bgr = None
+            thumb = None
+            motion_avg = None
+            last_sent = None
+            frame_index = self.start_frame
+            while not self._stop.is_set():
+                if self.stop_frame is not None and frame_index >= self.stop_frame:
+                    break
+                due = frame_index % self.stride == 0
+                if not due and not self.adaptive:
+                    if not self.cap.grab():
+                        break
+                    self.stats.skipped += 1
+                    frame_index += 1
+                    continue
+                if bgr is None and not self.convert and self._shape is not None:
+                    bgr = self._take_buffer(self._shape)
+                    if bgr is None:
+                        break
+                success, bgr = self.cap.read(bgr) if bgr is not None else self.cap.read()
+                if not success:
+                    break
+                if self._shape is None:
+                    self._shape = bgr.shape
+                    if not self.convert:
+                        self._allocated += 1
+                if self.adaptive:
+                    prev_thumb, thumb = thumb, self._thumbnail(bgr)
+                    moving = False
+                    if prev_thumb is not None:
+                        motion = float(cv2.absdiff(thumb, prev_thumb).mean())
+                        motion_avg = motion if motion_avg is None else 0.9 * motion_avg + 0.1 * motion
+                        moving = motion >= max(ADAPTIVE_MIN_MOTION, ADAPTIVE_MOTION_RATIO * motion_avg)
+                    due = last_sent is None or moving or frame_index - last_sent >= self.stride
+                    if not due:
+                        self.stats.skipped += 1
+                        frame_index += 1
+                        continue
+                time_sec = self.cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
+                if self.convert:
+                    image = self._take_buffer(bgr.shape)
+                    if image is None:
+                        break
+                    cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB, dst=image)
+                else:
+                    image, bgr = bgr, None  # hand the buffer itself to the consumer
+                if not self._put((frame_index, time_sec, image)):
+                    break
+                last_sent = frame_index
+                frame_index += 1
+        except Exception as e:
+            self._error = e
+        finally:
+            self._put(_END)
+
+    def _thumbnail(self, bgr):
+        small = cv2.resize(bgr, MOTION_THUMBNAIL_SIZE, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    def _take_buffer(self, shape):
+        try:
+            buf = self._free.get_nowait()
+        except queue.Empty:
+            if self._allocated < self._max_buffers:
+                self._allocated += 1
+                return np.empty(shape, dtype=np.uint8)
+            start = time.perf_counter()
+            buf = None
+            while buf is None and not self._stop.is_set():
+                try:
+                    buf = self._free.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            self.stats.decode_stalls += 1
+            self.stats.decode_stall_seconds += time.perf_counter() - start
+            if buf is None:
+                return None
+        return buf if buf.shape == shape else np.empty(shape, dtype=np.uint8)
+
+    def _put(self, item):
+        while True:
+            try:
+                self._frames.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                if self._stop.is_set():
+                    return False
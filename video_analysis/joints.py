@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+from video_analysis.sports import ALL_SPORTS, Sport
+from video_analysis.types import Joint, JOINT_LABELS, JOINT_LANDMARKS, NUM_LANDMARKS
+
+
+@dataclass(frozen=True)
+class JointSpec:
+    joint: Joint
+    label: str
+    landmarks: Tuple[int, int, int]  # proximal, vertex, distal
+
+
+class JointRegistry:
+    """Compiled joint definitions shared by angle computation, DTW and plotting.
+
+    ``triples`` is a read-only int32 ``(joints, 3)`` array in registry order;
+    ``rows(joints)`` maps a joint list to rows of it, so any subset of joints
+    can be gathered with one fancy index.
+    """
+
+    def __init__(self, landmarks: Dict[str, List[int]], labels: Dict[str, str]):
+        self.specs = tuple(
+            JointSpec(joint, labels[joint.value], tuple(landmarks[joint.value]))
+            for joint in Joint
+            if joint.value in landmarks
+        )
+        self.triples = np.array([spec.landmarks for spec in self.specs], dtype=np.int32).reshape(-1, 3)
+        self.triples.setflags(write=False)
+        self._rows = {spec.joint: k for k, spec in enumerate(self.specs)}
+
+    def __contains__(self, joint) -> bool:
+        return self._lookup(joint) is not None
+
+    def spec(self, joint) -> JointSpec:
+        row = self._lookup(joint)
+        if row is None:
+            raise KeyError(f"No joint definition for {joint!r}")
+        return self.specs[row]
+
+    def rows(self, joints: Iterable) -> np.ndarray:
+        """Registry rows for ``joints``; -1 for joints without a definition."""
+        return np.array([
+            row if row is not None else -1
+            for row in map(self._lookup, joints)
+        ], dtype=np.intp)
+
+    def require(self, joints: Iterable) -> None:
+        missing = [str(getattr(j, "value", j)) for j in joints if j not in self]
+        if missing:
+            raise ValueError(f"No joint definition for: {', '.join(missing)}")
+
+    def validate(self, sports: Dict[str, Sport]) -> None:
+        for spec in self.specs:
+            if len(set(spec.landmarks)) != 3 or not all(0 <= i < NUM_LANDMARKS for i in spec.landmarks):
+                raise ValueError(f"Invalid landmark triple for {spec.joint.value}: {spec.landmarks}")
+        for sport in sports.values():
+            for technique in sport.techniques:
+                where = f"{sport.key}/{technique.key}"
+                if len(set(technique.joints)) != len(technique.joints):
+                    raise ValueError(f"Duplicate joints in {where}")
+                missing = [j.value for j in technique.joints if j not in self]
+                if missing:
+                    raise ValueError(f"{where} uses joints with no definition: {', '.join(missing)}")
+
+    def _lookup(self, joint):
+        try:
+            return self._rows.get(Joint(joint))
+        except ValueError:
+            return None
+
+
+JOINTS = JointRegistry(JOINT_LANDMARKS, JOINT_LABELS)
+JOINTS.validate(ALL_SPORTS)
@@ -0,0 +1,325 @@
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from video_analysis.angle_analysis import compute_joint_angles
+from video_analysis.cache import DiskCache, file_digest, make_key
+from video_analysis.pose_extraction import extract_poses, extractor_settings
+from video_analysis.smoothing import DEFAULT_SMOOTHING, smooth_joint_angles, smoothing_params
+from video_analysis.time_alignment import clean, distance, dtw_row, joint_weight_vector, resample_uniform, sakoe_chiba_window
+
+LIBRARY_CACHE_DIR = "media/cache/library"
+LIBRARY_CACHE_MAX_BYTES = 256 * 1024 * 1024
+# Sakoe-Chiba half-width (frames) for matching a query against a library segment
+SEARCH_BAND = 15
+# Candidates whose lower bounds are evaluated together
+SEARCH_BATCH = 1024
+# The cheap first LB_Keogh pass only looks at every n-th query frame
+KEOGH_SAMPLE = 4
+# Grid (samples per second) for the query and the library when no target fps is set
+SEARCH_FPS = 30
+
+library_cache = DiskCache(LIBRARY_CACHE_DIR, LIBRARY_CACHE_MAX_BYTES)
+
+
+@dataclass
+class ReferenceEnvelope:
+    """Angle matrix of one library clip on the search grid plus its LB_Keogh envelope."""
+    series: np.ndarray  # (frames, joints), as from search_matrix
+    upper: np.ndarray
+    lower: np.ndarray
+    rate: float
+
+    def frame_time(self, frame: int) -> float:
+        return frame / self.rate
+
+
+@dataclass
+class LibraryMatch:
+    reference: object  # whatever key the caller passed in, e.g. a ReferenceVideo
+    start_frame: int
+    end_frame: int
+    start_time: float
+    end_time: float
+    distance: float
+    stats: Dict[str, float] = field(default_factory=dict)
+
+
+def envelope(series: np.ndarray, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Running max/min over ``+-radius`` frames, per joint."""
+    padded = np.pad(series, ((radius, radius), (0, 0)), mode="edge")
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * radius + 1, axis=0)
+    return windows.max(axis=-1), windows.min(axis=-1)
+
+
+def sampled_keogh(
+    query: np.ndarray,
+    query_upper: np.ndarray,
+    query_lower: np.ndarray,
+    series: np.ndarray,
+    upper: np.ndarray,
+    lower: np.ndarray,
+    sample: int
+) -> np.ndarray:
+    """LB_Keogh on every ``sample``-th query frame, for every start position.
+
+    Takes the larger of both directions: the query against the library
+    envelope, and the library against the query's envelope. Works in
+    contiguous chunks of the concatenated library. For each sampled query
+    frame it computes the excess at every position, then sums along each
+    start's diagonal through a strided view.
+    """
+    n, positions = len(query), len(series) - len(query) + 1
+    rows, rows_upper, rows_lower = query[::sample], query_upper[::sample], query_lower[::sample]
+    out = np.empty(positions, dtype=np.float32)
+    for begin in range(0, positions, 8 * SEARCH_BATCH):
+        end = min(begin + 8 * SEARCH_BATCH, positions)
+        span = slice(begin, end + n - 1)
+        forward = np.zeros((len(rows), end + n - 1 - begin), dtype=np.float32)
+        reverse = np.zeros_like(forward)
+        for j in range(query.shape[1]):
+            q, qu, ql = rows[:, j, np.newaxis], rows_upper[:, j, np.newaxis], rows_lower[:, j, np.newaxis]
+            c = series[span, j]
+            forward += np.maximum(np.maximum(q - upper[span, j], lower[span, j] - q), 0)
+            reverse += np.maximum(np.maximum(c - qu, ql - c), 0)
+        item = forward.itemsize
+        shape, strides = (end - begin, len(rows)), (item, (forward.shape[1] + sample) * item)
+        out[begin:end] = np.maximum(
+            np.lib.stride_tricks.as_strided(forward, shape=shape, strides=strides).sum(axis=1),
+            np.lib.stride_tricks.as_strided(reverse, shape=shape, strides=strides).sum(axis=1),
+        )
+    return out
+
+
+def search_rate(target_fps=None) -> float:
+    return float(target_fps or SEARCH_FPS)
+
+
+def search_matrix(angles: Dict, joints: List) -> np.ndarray:
+    """Stack joint series (degrees, equally weighted) into a ``(frames, joints)`` matrix.
+
+    The query and every library window are scaled the same fixed way, so
+    distances compare across windows and clips. Z-normalizing each clip as
+    a whole would shift the query and a window by different clip means.
+    """
+    return np.stack([clean(angles[joint]) for joint in joints], axis=1) * joint_weight_vector(joints)
+
+
+def prepare_clip(video_path: str, joints: List, smoothing=DEFAULT_SMOOTHING, parallel=False, chunk_seconds=None,
+                 **sampling) -> np.ndarray:
+    """Search matrix of one clip, resampled onto the ``1 / search_rate`` grid and smoothed."""
+    poses = extract_poses([video_path], parallel, chunk_seconds, **sampling)[0]
+    if len(poses) < 2:
+        return np.empty((0, len(joints)), dtype=np.float32)
+    angles = compute_joint_angles(poses, joints)
+    rate = search_rate(sampling.get("target_fps"))
+    grid = {joint: resample_uniform(poses.times, angles[joint], 1.0 / rate) for joint in joints}
+    return search_matrix(smooth_joint_angles(grid, joints, smoothing, rate), joints)
+
+
+def envelope_key(video_path: str, joints: List, radius: int, options: Dict) -> str:
+    chunk_seconds = options.get("chunk_seconds") if options.get("parallel") else None
+    settings = extractor_settings(adaptive=options.get("adaptive", False), crop=options.get("crop", False),
+                                  chunk_seconds=chunk_seconds)
+    smoothing = smoothing_params(options.get("smoothing", DEFAULT_SMOOTHING))
+    return make_key("envelope", file_digest(video_path), settings, options.get("target_fps"),
+                    search_rate(options.get("target_fps")), smoothing, [joint.value for joint in joints], radius)
+
+
+def cached_envelope(video_path: str, joints: List, radius: int = SEARCH_BAND, **options) -> Optional[ReferenceEnvelope]:
+    """Envelope for one library clip if ``reference_envelope`` already built it, else None."""
+    cached = library_cache.load_arrays(envelope_key(video_path, joints, radius, options))
+    if cached is None:
+        return None
+    return ReferenceEnvelope(cached["series"], cached["upper"], cached["lower"], float(cached["rate"]))
+
+
+def reference_envelope(video_path: str, joints: List, radius: int = SEARCH_BAND, **options) -> ReferenceEnvelope:
+    """Envelope for one library clip, computed once and kept in ``library_cache``.
+
+    ``options`` are those of ``prepare_clip`` and must match the query's.
+    """
+    cached = cached_envelope(video_path, joints, radius, **options)
+    if cached is not None:
+        return cached
+
+    series = prepare_clip(video_path, joints, **options)
+    rate = search_rate(options.get("target_fps"))
+    upper, lower = envelope(series, radius)
+    library_cache.store_arrays(envelope_key(video_path, joints, radius, options), {
+        "series": series, "upper": upper, "lower": lower, "rate": np.array(rate),
+    })
+    return ReferenceEnvelope(series, upper, lower, rate)
+
+
+def band_distance(
+    query: np.ndarray,
+    candidate: np.ndarray,
+    radius: int,
+    abandon_above: float = np.inf,
+    remaining: Optional[np.ndarray] = None,
+    window: Optional[Tuple[np.ndarray, np.ndarray]] = None
+) -> float:
+    """DTW cost of ``query`` vs an equally long ``candidate`` inside a band.
+
+    Both ends are pinned. Every path crosses every row, so the cheapest cell
+    of row ``i`` plus ``remaining[i]`` (a lower bound for rows after ``i``,
+    e.g. the LB_Keogh tail) bounds the result. Returns ``inf`` as soon as
+    that reaches ``abandon_above``. ``window`` is the precomputed band.
+    """
+    n = len(query)
+    if remaining is None:
+        remaining = np.zeros(n + 1)
+    lo, hi = window or sakoe_chiba_window(n, n, radius)
+    prev_lo, prev = 0, np.full(n + 1, np.inf)
+    prev[0] = 0.0
+    for i in range(1, n + 1):
+        row = dtw_row(prev_lo, prev, distance(query[i - 1], candidate[lo[i] - 1:hi[i] - 1]).astype(np.float64), lo[i])
+        if row.min() + remaining[i] >= abandon_above:
+            return np.inf
+        prev_lo, prev = lo[i], row
+    return float(prev[n - prev_lo])
+
+
+def find_best_match(
+    query: np.ndarray,
+    references: Sequence[Tuple[object, ReferenceEnvelope]],
+    radius: int = SEARCH_BAND,
+    stride: int = 1
+) -> Optional[LibraryMatch]:
+    """Library segment closest to ``query`` under band-constrained DTW.
+
+    Every ``stride``-th start of every clip at least as long as the query is
+    a candidate. The best distance so far is seeded from the most promising
+    candidate. Then a cascade of cheaper-to-tighter bounds discards the
+    rest: LB_Kim (matched end points), then LB_Keogh on every
+    ``KEOGH_SAMPLE``-th frame, then LB_Keogh on all frames. LB_Keogh is
+    taken both ways: the query against the cached library envelopes, and
+    the library segment against the query's envelope. DTW runs in bound order until the bound reaches the
+    best distance. Each DTW also stops early once it can no longer win. The
+    bounds never exceed the true distance, so the result is the same as
+    checking every candidate.
+    """
+    started = time.perf_counter()
+    n = len(query)
+    usable = [(key, ref) for key, ref in references if len(ref.series) >= n > 1]
+    if not usable:
+        return None
+
+    offsets = np.cumsum([0] + [len(ref.series) for _, ref in usable])
+    series = np.concatenate([ref.series for _, ref in usable])
+    upper = np.concatenate([ref.upper for _, ref in usable])
+    lower = np.concatenate([ref.lower for _, ref in usable])
+    starts = np.concatenate([
+        offsets[k] + np.arange(0, len(ref.series) - n + 1, stride) for k, (_, ref) in enumerate(usable)
+    ])
+
+    window = sakoe_chiba_window(n, n, radius)
+    q = query.T
+    query_upper, query_lower = envelope(query, radius)
+    upper_windows = np.lib.stride_tricks.sliding_window_view(upper, n, axis=0)
+    lower_windows = np.lib.stride_tricks.sliding_window_view(lower, n, axis=0)
+    series_windows = np.lib.stride_tricks.sliding_window_view(series, n, axis=0)
+
+    # LB_Kim: both ends of a pinned path are always matched
+    kim = distance(query[0], series[starts]) + distance(query[-1], series[starts + n - 1])
+
+    def keogh_rows(candidates):
+        s = starts[candidates]
+        # upper >= lower, so at most one side is positive
+        return np.maximum(np.maximum(q - upper_windows[s], lower_windows[s] - q), 0).sum(axis=1)
+
+    def keogh(candidates):
+        # Max of LB_Keogh both ways: query vs library envelope, library vs query envelope
+        bound = []
+        for b in range(0, len(candidates), SEARCH_BATCH):
+            chunk = candidates[b:b + SEARCH_BATCH]
+            c = series_windows[starts[chunk]]
+            reverse = np.maximum(np.maximum(c - query_upper.T, query_lower.T - c), 0).sum(axis=(1, 2))
+            bound.append(np.maximum(keogh_rows(chunk).sum(axis=1), reverse))
+        return np.concatenate(bound or [np.empty(0)])
+
+    # Seed the best-so-far with the tightest bound among the lowest-LB_Kim batch
+    seed = np.argsort(kim, kind="stable")[:SEARCH_BATCH]
+    first = int(starts[seed[np.argmin(keogh(seed))]])
+    best, best_start = band_distance(query, series[first:first + n], radius, window=window), first
+
+    # Cascade: LB_Kim, LB_Keogh on every KEOGH_SAMPLE-th frame, full LB_Keogh;
+    # DTW then runs in bound order until the bound reaches the best distance
+    after_kim = np.flatnonzero(kim < best)
+    sampled = sampled_keogh(query, query_upper, query_lower, series, upper, lower, KEOGH_SAMPLE)[starts[after_kim]]
+    after_sampled = after_kim[sampled < best]
+    bound = np.maximum(kim[after_sampled], keogh(after_sampled))
+    keep = np.argsort(bound, kind="stable")
+    order, bound = after_sampled[keep], bound[keep]
+    dtw_runs, abandoned = 1, 0
+    for begin in range(0, len(order), SEARCH_BATCH // 4):
+        batch = order[begin:begin + SEARCH_BATCH // 4]
+        if bound[begin] >= best:
+            break
+        # LB_Keogh of the rows still to come, for early abandoning
+        tails = np.cumsum(keogh_rows(batch)[:, ::-1], axis=1)[:, ::-1]
+        for k, candidate in enumerate(batch):
+            if bound[begin + k] >= best:
+                break
+            start = int(starts[candidate])
+            if start == first:
+                continue
+            dtw_runs += 1
+            d = band_distance(query, series[start:start + n], radius, best, np.append(tails[k], 0.0), window)
+            if d < best:
+                best, best_start = d, start
+            elif not np.isfinite(d):
+                abandoned += 1
+
+    k = int(np.searchsorted(offsets, best_start, side="right")) - 1
+    key, ref = usable[k]
+    start = best_start - int(offsets[k])
+    return LibraryMatch(
+        reference=key,
+        start_frame=start,
+        end_frame=start + n - 1,
+        start_time=ref.frame_time(start),
+        end_time=ref.frame_time(start + n - 1),
+        distance=best,
+        stats={
+            "clips": len(usable),
+            "candidates": len(starts),
+            "pruned_lb_kim": len(starts) - len(after_kim),
+            "pruned_lb_keogh_sampled": len(after_kim) - len(after_sampled),
+            "pruned_lb_keogh": len(after_sampled) - (dtw_runs - 1),
+            "dtw_runs": dtw_runs,
+            "dtw_abandoned": abandoned,
+            "pruning_rate": 1 - dtw_runs / len(starts),
+            "search_seconds": time.perf_counter() - started,
+        },
+    )
+
+
+def search_library(
+    video_path: str,
+    envelopes: Sequence[Tuple[object, ReferenceEnvelope]],
+    joints: List,
+    radius: int = SEARCH_BAND,
+    **options
+) -> Optional[LibraryMatch]:
+    """Best match for ``video_path`` among ``(key, envelope)`` library clips.
+
+    ``options`` are those of ``extract_poses`` plus ``smoothing``. The query is resampled onto
+    the ``1 / search_rate`` grid the envelopes were built on, so one query
+    frame spans the same time as one library frame whatever the clips'
+    native rates. Build the envelopes ahead of time with
+    ``reference_envelope`` and the same ``options`` and ``radius``.
+    """
+    started = time.perf_counter()
+    query = prepare_clip(video_path, joints, **options)
+    prepared = time.perf_counter()
+    match = find_best_match(query, envelopes, radius)
+    if match is not None:
+        match.stats.update({
+            "query_seconds": prepared - started,
+            "total_seconds": time.perf_counter() - started,
+        })
+    return match
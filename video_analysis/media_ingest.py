@@ -0,0 +1,118 @@
+"""Put input videos into a run's results directory without re-encoding them.
+
+An MP4 holding a browser-playable codec is linked or copied as-is:
+hardlink, then reflink (copy-on-write clone), then a plain byte copy. Any
+other container holding a playable codec is remuxed into MP4 with
+``ffmpeg -c copy``. Only other codecs are transcoded. ffmpeg is optional:
+without it, those inputs are byte-copied too, since OpenCV reads the
+content whatever the file is called.
+"""
+import os
+import shutil
+import subprocess
+
+import cv2
+
+FFMPEG = os.environ.get("MOVEMATCH_FFMPEG", "ffmpeg")
+FFPROBE = os.environ.get("MOVEMATCH_FFPROBE", "ffprobe")
+# Video codecs that play in an MP4 in every major browser
+PLAYABLE_CODECS = {"h264"}
+TRANSCODE_ARGS = ["-c:v", "libx264", "-preset", "veryfast", "-crf", "18", "-pix_fmt", "yuv420p", "-c:a", "aac"]
+FICLONE = 0x40049409  # linux/fs.h
+
+FOURCC_CODECS = {
+    "avc1": "h264", "h264": "h264", "x264": "h264",
+    "hev1": "hevc", "hvc1": "hevc", "hevc": "hevc",
+    "mp4v": "mpeg4", "fmp4": "mpeg4",
+}
+
+
+def is_mp4(path):
+    """ISO base media file with an MP4 (not QuickTime) brand."""
+    with open(path, "rb") as f:
+        head = f.read(12)
+    return head[4:8] == b"ftyp" and head[8:12] != b"qt  "
+
+
+def video_codec(path):
+    """Codec name of the first video stream, as ffprobe names it."""
+    if shutil.which(FFPROBE):
+        probe = subprocess.run(
+            [FFPROBE, "-v", "error", "-select_streams", "v:0", "-show_entries", "stream=codec_name",
+             "-of", "default=noprint_wrappers=1:nokey=1", path],
+            capture_output=True, text=True)
+        if probe.returncode == 0 and probe.stdout.strip():
+            return probe.stdout.strip()
+    cap = cv2.VideoCapture(path)
+    fourcc = int(cap.get(cv2.CAP_PROP_FOURCC))
+    cap.release()
+    tag = "".join(chr((fourcc >> 8 * i) & 0xFF) for i in range(4)).strip().lower()
+    return FOURCC_CODECS.get(tag, tag)
+
+
+def reflink(src, dst):
+    """Copy-on-write clone via the Linux FICLONE ioctl. Raises ``OSError`` where that is unavailable."""
+    try:
+        import fcntl
+    except ImportError as e:
+        raise OSError("reflink needs fcntl") from e
+    with open(src, "rb") as fin, open(dst, "wb") as fout:
+        try:
+            fcntl.ioctl(fout.fileno(), FICLONE, fin.fileno())
+        except OSError:
+            fout.close()
+            os.remove(dst)
+            raise
+
+
+def link_or_copy(src, dst):
+    """Cheapest way to give ``dst`` the bytes of ``src``; returns the one used."""
+    try:
+        os.link(src, dst)
+        return "hardlink"
+    except OSError:
+        pass
+    try:
+        reflink(src, dst)
+        return "reflink"
+    except OSError:
+        pass
+    shutil.copyfile(src, dst)
+    return "copy"
+
+
+def ffmpeg(src, dst, codec_args):
+    subprocess.run([FFMPEG, "-v", "error", "-y", "-i", src, "-map", "0:v:0", "-map", "0:a?", *codec_args,
+                    "-movflags", "+faststart", dst], check=True, capture_output=True)
+
+
+def ingest_video(src, dst):
+    """Make ``dst`` a playable MP4 of ``src`` as cheaply as possible.
+
+    Returns how: ``"hardlink"``, ``"reflink"``, ``"copy"``, ``"remux"`` or
+    ``"transcode"``.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(dst)), exist_ok=True)
+    playable = video_codec(src) in PLAYABLE_CODECS
+    if (playable and is_mp4(src)) or not shutil.which(FFMPEG):
+        return link_or_copy(src, dst)
+    if playable:
+        try:
+            ffmpeg(src, dst, ["-c", "copy"])
+            return "remux"
+        except subprocess.CalledProcessError:
+            pass  # e.g. an audio codec MP4 cannot hold; re-encode instead
+    ffmpeg(src, dst, TRANSCODE_ARGS)
+    return "transcode"
+
+
+def ensure_mp4(path):
+    """``path`` if it already plays in a browser, else a converted ``<name>_web.mp4`` beside it.
+
+    Without ffmpeg there is nothing to convert with, so ``path`` is returned.
+    """
+    if (is_mp4(path) and video_codec(path) in PLAYABLE_CODECS) or not shutil.which(FFMPEG):
+        return path
+    converted = os.path.splitext(path)[0] + "_web.mp4"
+    ingest_video(path, converted)
+    return converted
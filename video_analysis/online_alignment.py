@@ -0,0 +1,136 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from video_analysis.time_alignment import clean, distance, dtw_row, joint_weight_vector, prepare_angle_matrix
+
+# Backtrack move codes, in the tie order of time_alignment.backtrack
+MOVE_UP, MOVE_LEFT, MOVE_DIAG = 0, 1, 2
+
+
+def series_stats(seq: List[Optional[float]]) -> Tuple[float, float]:
+    """Mean and std that ``z_normalize(clean(seq))`` would use."""
+    arr = clean(seq)
+    return float(np.mean(arr)), float(np.std(arr))
+
+
+class OnlineDTW:
+    """Align incoming frames against a fixed reference, one frame at a time.
+
+    Same recurrence and open begin/end as ``compute_dtw_mapping`` (incoming
+    frames are ``seq1``, the reference is ``seq2``), but only the latest cost
+    row (the frontier) is kept, so memory does not grow with the stream.
+    After each frame, ``position`` is the reference frame where the best
+    alignment of everything seen so far ends.
+
+    ``reference`` is already prepared (``z_normalize(clean(...))``, or a
+    ``prepare_angle_matrix`` result). Incoming raw values are normalized with
+    the given ``mean``/``std`` and multiplied by ``scale``; missing values
+    map to the mean. Offline normalization uses statistics of the complete
+    input, which a stream cannot know yet. Given those statistics (see
+    ``series_stats``), the final cost is the offline one and so is the path,
+    apart from exact ties (rows are filled with ``dtw_row``, which rounds
+    differently in the last bits).
+
+    With ``keep_path`` one byte per cell records the move, so ``path()``
+    can backtrack. That is an eighth of the offline cost matrix. Without it
+    only the frontier is stored.
+    """
+
+    def __init__(self, reference: np.ndarray, mean=0.0, std=1.0, scale=1.0, keep_path: bool = True):
+        self.reference = np.asarray(reference, dtype=np.float32)
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.std = np.asarray(std, dtype=np.float32)
+        self.scale = np.asarray(scale, dtype=np.float32)
+        self.frontier = np.zeros(len(self.reference) + 1)  # open begin
+        self.moves: Optional[List[np.ndarray]] = [] if keep_path else None
+        self.frames = 0
+
+    @classmethod
+    def for_joints(
+        cls,
+        reference_angles: Dict,
+        joints: List,
+        stats: Optional[Dict] = None,
+        weights: Optional[Dict] = None,
+        keep_path: bool = True
+    ) -> "OnlineDTW":
+        """Multivariate aligner matching ``align_joint_angles``.
+
+        ``stats`` maps each joint to the ``(mean, std)`` of the incoming
+        series. It defaults to the reference's own statistics, which is a
+        close estimate when both clips show the same movement.
+        """
+        if stats is None:
+            stats = {joint: series_stats(reference_angles[joint]) for joint in joints}
+        mean, std = np.array([stats[joint] for joint in joints], dtype=np.float32).T
+        return cls(prepare_angle_matrix(reference_angles, joints, weights), mean, std,
+                   joint_weight_vector(joints, weights), keep_path)
+
+    def normalize(self, values) -> np.ndarray:
+        x = np.asarray(values, dtype=np.float32)
+        return np.where(np.isnan(x), np.float32(0), (x - self.mean) / (self.std + 1e-8)) * self.scale
+
+    def update(self, values) -> int:
+        """Add one frame (a scalar, or one value per joint); returns ``position``."""
+        x = self.normalize(values)
+        prev = self.frontier
+        row = np.empty_like(prev)
+        row[0] = np.inf
+        row[1:] = dtw_row(0, prev, distance(x, self.reference).astype(np.float64), 1)
+        if self.moves is not None:
+            up, left, diag = prev[1:], row[:-1], prev[:-1]
+            self.moves.append(np.where(
+                (up <= left) & (up <= diag), MOVE_UP, np.where(left <= diag, MOVE_LEFT, MOVE_DIAG)
+            ).astype(np.uint8))
+        self.frontier = row
+        self.frames += 1
+        return self.position
+
+    def extend(self, block: Iterable) -> np.ndarray:
+        """Add several frames; returns the position after each one."""
+        return np.array([self.update(values) for values in block], dtype=np.intp)
+
+    @property
+    def position(self) -> int:
+        """Reference frame the alignment currently ends on (-1 before any input)."""
+        return int(np.argmin(self.frontier)) - 1 if self.frames else -1
+
+    @property
+    def cost(self) -> float:
+        return float(np.min(self.frontier)) if self.frames else 0.0
+
+    def path(self) -> List[Tuple[int, int]]:
+        """Warping path of all frames so far, as ``compute_dtw_mapping`` returns it."""
+        if self.moves is None:
+            raise ValueError("OnlineDTW was created with keep_path=False")
+        path = []
+        i, j = self.frames, self.position + 1
+        while i > 0 and j > 0:
+            path.append((i - 1, j - 1))
+            move = self.moves[i - 1][j - 1]
+            if move == MOVE_UP:
+                i -= 1
+            elif move == MOVE_LEFT:
+                j -= 1
+            else:
+                i, j = i - 1, j - 1
+        path.reverse()
+        return path
+
+
+def align_angle_stream(
+    angle_blocks: Iterable[Tuple[np.ndarray, Dict]],
+    aligner: OnlineDTW,
+    joints: List
+) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """Feed ``iter_joint_angles`` blocks to ``aligner`` as they are extracted.
+
+    Yields ``(times, positions)`` per block, so alignment overlaps with pose
+    extraction. The stream should be uniformly sampled (no adaptive
+    sampling), as offline alignment resamples to an even time step first.
+    """
+    for times, angles in angle_blocks:
+        block = np.array([[np.nan if v is None else v for v in angles[joint]] for joint in joints],
+                         dtype=np.float32).T
+        yield times, aligner.extend(block)
@@ -0,0 +1,68 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Iterable, List, Optional
+
+# MediaPipe and TensorFlow are not fork-safe once initialised, so workers are spawned.
+POOL_SIZE = int(os.environ.get("MOVEMATCH_POOL_SIZE", "0")) or os.cpu_count() or 1
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def configure_pool(max_workers: int) -> None:
+    """Set the worker count; the running pool is replaced on next use."""
+    global POOL_SIZE
+    if max_workers < 1:
+        raise ValueError("max_workers must be at least 1")
+    POOL_SIZE = max_workers
+    shutdown_pool()
+
+
+def _init_worker() -> None:
+    # Build a pose graph as the worker boots so the first video doesn't pay for it
+    from video_analysis.estimator_pool import warm_estimators
+    warm_estimators()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=POOL_SIZE,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _pool
+
+
+def shutdown_pool(wait: bool = True) -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait)
+
+
+def submit(fn: Callable, *args, **kwargs) -> Future:
+    try:
+        return get_pool().submit(fn, *args, **kwargs)
+    except BrokenProcessPool:
+        shutdown_pool(wait=False)
+        return get_pool().submit(fn, *args, **kwargs)
+
+
+def gather(futures: Iterable[Future]) -> List:
+    """Wait for futures in order, re-raising the first worker error in the caller.
+
+    A crashed worker breaks the whole executor, so the pool is dropped and
+    rebuilt for the next request.
+    """
+    try:
+        return [future.result() for future in futures]
+    except BrokenProcessPool:
+        shutdown_pool(wait=False)
+        raise
@@ -0,0 +1,88 @@
+import cv2
+import numpy as np
+
+# Long side of the crop handed to MediaPipe; its landmark model runs at 256 px.
+CROP_SIZE = 512
+# Long side when no person is being tracked and the whole frame is used.
+FULL_FRAME_SIZE = 1280
+# Context added around the landmark bounding box, as a fraction of its size.
+CROP_MARGIN = 0.35
+MIN_VISIBILITY = 0.5
+
+
+class PersonCrop:
+    """Crop and downscale frames around the athlete before pose inference.
+
+    The crop window follows the previous frame's landmarks. It only moves
+    when the athlete gets close to its edge, so MediaPipe's own tracker sees
+    a stable image most of the time. Landmarks are returned by the model in
+    crop coordinates and mapped back with ``to_full_frame``.
+    """
+
+    def __init__(self, crop_size=CROP_SIZE, full_frame_size=FULL_FRAME_SIZE, margin=CROP_MARGIN):
+        self.crop_size = crop_size
+        self.full_frame_size = full_frame_size
+        self.margin = margin
+        self.window = None  # (x0, y0, width, height) in pixels, None for the full frame
+        self._used = None
+        self._frame_size = None
+
+    def prepare(self, bgr):
+        h, w = bgr.shape[:2]
+        self._frame_size = (w, h)
+        x0, y0, cw, ch = self.window if self.window is not None else (0, 0, w, h)
+        self._used = (x0, y0, cw, ch)
+        limit = self.crop_size if self.window is not None else self.full_frame_size
+        region = bgr[y0:y0 + ch, x0:x0 + cw]
+        scale = limit / max(cw, ch)
+        if scale < 1.0:
+            region = cv2.resize(region, (max(1, round(cw * scale)), max(1, round(ch * scale))),
+                                interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(region, cv2.COLOR_BGR2RGB)
+
+    def to_full_frame(self, row):
+        """Map a ``(33, 4)`` landmark row from crop to full-frame coordinates, in place."""
+        x0, y0, cw, ch = self._used
+        w, h = self._frame_size
+        row[:, 0] = (row[:, 0] * cw + x0) / w
+        row[:, 1] = (row[:, 1] * ch + y0) / h
+        row[:, 2] *= cw / w  # MediaPipe z is on the same scale as x
+        return row
+
+    def update(self, row, found):
+        """Move the window to follow ``row``. Returns whether the window changed.
+
+        The caller must restart the estimator's tracking when it does, since
+        its tracked region is in the old window's coordinates.
+        """
+        previous = self.window
+        if not found:
+            self.window = None
+            return previous is not None
+        w, h = self._frame_size
+        visible = row[:, 3] >= MIN_VISIBILITY
+        pts = row[visible] if visible.sum() >= 4 else row
+        bx0, by0 = pts[:, 0].min() * w, pts[:, 1].min() * h
+        bx1, by1 = pts[:, 0].max() * w, pts[:, 1].max() * h
+        if self.window is not None and self._fits(bx0, by0, bx1, by1):
+            return False
+        size = max(bx1 - bx0, by1 - by0) * (1 + 2 * self.margin)
+        cx, cy = (bx0 + bx1) / 2, (by0 + by1) / 2
+        x0 = int(np.clip(cx - size / 2, 0, w - 1))
+        y0 = int(np.clip(cy - size / 2, 0, h - 1))
+        x1 = int(np.clip(cx + size / 2, x0 + 1, w))
+        y1 = int(np.clip(cy + size / 2, y0 + 1, h))
+        self.window = (x0, y0, x1 - x0, y1 - y0)
+        return self.window != previous
+
+    def _fits(self, bx0, by0, bx1, by1):
+        # Keep the window while the body stays clear of its edges and still fills a fair part of it
+        x0, y0, cw, ch = self.window
+        w, h = self._frame_size
+        pad_x, pad_y = cw * self.margin / 4, ch * self.margin / 4
+        inside = (
+            (bx0 >= x0 + pad_x or x0 == 0) and (by0 >= y0 + pad_y or y0 == 0)
+            and (bx1 <= x0 + cw - pad_x or x0 + cw == w) and (by1 <= y0 + ch - pad_y or y0 + ch == h)
+        )
+        snug = max(bx1 - bx0, by1 - by0) >= max(cw, ch) / (2 * (1 + 2 * self.margin))
+        return inside and snug
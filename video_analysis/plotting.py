@@ -1,38 +1,146 @@
-import os
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import numpy as np
-
-def smooth_angles(data, window=15):
-    arr = np.array([x if x is not None else np.nan for x in data])
-    if np.all(np.isnan(arr)):
-        return [0] * len(arr)
-    arr[np.isnan(arr)] = np.nanmean(arr)
-    return np.convolve(arr, np.ones(window) / window, mode='same').tolist()
-
-def plot_joint_angles(user, comp, path, title=""):
-    os.makedirs(os.path.dirname(path), exist_ok=True)
-    plt.figure(figsize=(10, 4))
-    plt.plot(smooth_angles(user), label="User", color='blue')
-    plt.plot(smooth_angles(comp), label="Comparison", color='green')
-    plt.title(title)
-    plt.xlabel("Frame")
-    plt.ylabel("Angle (°)")
-    plt.legend()
-    plt.grid()
-    plt.tight_layout()
-    plt.savefig(path)
-    plt.close()
-
-def plot_dtw_mapping(path, output_path):
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    x, y = zip(*path)
-    plt.figure(figsize=(6, 6))
-    plt.plot(x, y, color="purple")
-    plt.xlabel("User Frame")
-    plt.ylabel("Pro Frame")
-    plt.title("DTW Alignment Path")
-    plt.grid()
-    plt.savefig(output_path)
-    plt.close()
\ No newline at end of file
+import os
+import threading
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import numpy as np
+
+# zlib level for saved PNGs; the default (6) spends more time compressing
+# than drawing, for files only ~12% smaller
+PNG_COMPRESS_LEVEL = 1
+
+
+def style_angle_axes(ax, title=""):
+    user, = ax.plot([], [], label="User", color='blue')
+    comp, = ax.plot([], [], label="Comparison", color='green')
+    ax.set_title(title)
+    ax.set_xlabel("Frame")
+    ax.set_ylabel("Angle (°)")
+    ax.legend(loc="upper right")
+    ax.grid()
+    return user, comp
+
+
+def style_dtw_axes(ax):
+    line, = ax.plot([], [], color="purple")
+    ax.set_xlabel("User Frame")
+    ax.set_ylabel("Pro Frame")
+    ax.set_title("DTW Alignment Path")
+    ax.grid()
+    return line
+
+
+def set_angle_data(lines, user, comp):
+    # Series arrive smoothed (see smoothing); missing samples show as gaps
+    for line, data in zip(lines, (user, comp)):
+        values = np.array([np.nan if v is None else v for v in data], dtype=float)
+        line.set_data(np.arange(len(values)), values)
+
+
+def set_dtw_data(line, path):
+    steps = np.asarray(path).reshape(-1, 2)
+    line.set_data(steps[:, 0], steps[:, 1])
+
+
+def make_parent(output):
+    # Outputs are file paths or binary file objects
+    if isinstance(output, str):
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+
+
+def rescale(ax):
+    ax.relim()
+    ax.autoscale_view()
+
+
+class PlotRenderer:
+    """Reusable figures for the analysis plots.
+
+    Each figure, with its axes, lines, labels and legend, is built once
+    with the object-oriented API, so no pyplot global state is touched. A
+    render only swaps line data, rescales and saves. Layout is computed on
+    the first render of each figure. Figures are not thread-safe; use
+    ``get_renderer()`` for a per-thread instance.
+    """
+
+    def __init__(self):
+        self.angle_figure = Figure(figsize=(10, 4))
+        FigureCanvasAgg(self.angle_figure)
+        self.angle_axes = self.angle_figure.add_subplot()
+        self.angle_lines = style_angle_axes(self.angle_axes)
+        self.dtw_figure = Figure(figsize=(6, 6))
+        FigureCanvasAgg(self.dtw_figure)
+        self.dtw_axes = self.dtw_figure.add_subplot()
+        self.dtw_line = style_dtw_axes(self.dtw_axes)
+        self.summaries = {}  # number of joints -> (figure, panels, dtw line)
+        self._laid_out = set()
+
+    def render_joint_angles(self, user, comp, path, title=""):
+        make_parent(path)
+        set_angle_data(self.angle_lines, user, comp)
+        self.angle_axes.set_title(title)
+        rescale(self.angle_axes)
+        self._save(self.angle_figure, path)
+
+    def render_dtw_mapping(self, path, output_path):
+        make_parent(output_path)
+        set_dtw_data(self.dtw_line, path)
+        rescale(self.dtw_axes)
+        self._save(self.dtw_figure, output_path)
+
+    def render_summary(self, panels, dtw_path, output_path):
+        """One image for the whole run.
+
+        ``panels`` is a list of ``(label, user, comp, aligned_user)`` per
+        joint, drawn as raw and aligned side by side. The shared DTW path
+        goes underneath.
+        """
+        make_parent(output_path)
+        figure, axes, dtw_line = self._summary(len(panels))
+        for (label, user, comp, aligned), (raw_ax, raw_lines, aligned_ax, aligned_lines) in zip(panels, axes):
+            set_angle_data(raw_lines, user, comp)
+            set_angle_data(aligned_lines, aligned, comp)
+            raw_ax.set_title(f"{label} (Raw)")
+            aligned_ax.set_title(f"{label} (Aligned)")
+            rescale(raw_ax)
+            rescale(aligned_ax)
+        set_dtw_data(dtw_line, dtw_path)
+        rescale(dtw_line.axes)
+        self._save(figure, output_path)
+
+    def _summary(self, joints):
+        if joints not in self.summaries:
+            figure = Figure(figsize=(16, 3.5 * joints + 5))
+            FigureCanvasAgg(figure)
+            grid = figure.add_gridspec(joints + 1, 2, height_ratios=[3.5] * joints + [5])
+            axes = []
+            for row in range(joints):
+                raw_ax = figure.add_subplot(grid[row, 0])
+                aligned_ax = figure.add_subplot(grid[row, 1])
+                axes.append((raw_ax, style_angle_axes(raw_ax), aligned_ax, style_angle_axes(aligned_ax)))
+            dtw_line = style_dtw_axes(figure.add_subplot(grid[joints, :]))
+            self.summaries[joints] = (figure, axes, dtw_line)
+        return self.summaries[joints]
+
+    def _save(self, figure, path):
+        if id(figure) not in self._laid_out:
+            figure.tight_layout()
+            self._laid_out.add(id(figure))
+        figure.savefig(path, format="png", pil_kwargs={"compress_level": PNG_COMPRESS_LEVEL})
+
+
+_local = threading.local()
+
+
+def get_renderer():
+    """The calling thread's ``PlotRenderer``, created on first use."""
+    if not hasattr(_local, "renderer"):
+        _local.renderer = PlotRenderer()
+    return _local.renderer
+
+
+def plot_joint_angles(user, comp, path, title=""):
+    get_renderer().render_joint_angles(user, comp, path, title)
+
+
+def plot_dtw_mapping(path, output_path):
+    get_renderer().render_dtw_mapping(path, output_path)
@@ -1,25 +1,264 @@
-import cv2
-import mediapipe as mp
-from video_analysis.types import Frame, Pose, Point3D
-
-def extract_3d_poses(video_path):
-    frames = []
-    cap = cv2.VideoCapture(video_path)
-    mp_pose = mp.solutions.pose
-
-    with mp_pose.Pose(static_image_mode=False, model_complexity=2) as pose:
-        while cap.isOpened():
-            success, frame = cap.read()
-            if not success:
-                break
-
-            time_sec = cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0
-            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            result = pose.process(rgb)
-
-            keypoints = [Point3D(lm.x, lm.y, lm.z) if result.pose_landmarks else None for lm in result.pose_landmarks.landmark] if result.pose_landmarks else [None] * 33
-
-            frames.append(Frame(time=time_sec, pose=Pose(keypoints=keypoints)))
-
-    cap.release()
-    return frames
+import cv2
+import mediapipe as mp
+import numpy as np
+from video_analysis import parallel
+from video_analysis.cache import DiskCache, file_digest, make_key
+from video_analysis.estimator_pool import estimator_pool
+from video_analysis.frame_pipeline import FramePipeline
+from video_analysis.person_crop import PersonCrop
+from video_analysis.types import PoseSequence, NUM_LANDMARKS, LANDMARK_FIELDS
+
+POSE_CACHE_DIR = "media/cache/poses"
+POSE_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Chunked extraction: each chunk re-reads this much video before its range
+# so the tracker has settled by the time its own frames start.
+CHUNK_WARMUP_SECONDS = 1.0
+MIN_CHUNK_FRAMES = 60
+STREAM_BLOCK_SIZE = 64
+
+pose_cache = DiskCache(POSE_CACHE_DIR, POSE_CACHE_MAX_BYTES)
+
+
+def landmarks_to_array(result):
+    row = np.zeros((NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+    if not result.pose_landmarks:
+        return row, False
+    row[:] = [(lm.x, lm.y, lm.z, lm.visibility) for lm in result.pose_landmarks.landmark]
+    return row, True
+
+
+def extractor_settings(model_complexity=2, stride=1, adaptive=False, chunk_seconds=None, crop=False):
+    return {
+        "model": f"mediapipe-pose-{mp.__version__}",
+        "complexity": model_complexity,
+        "stride": stride,
+        "adaptive": adaptive,
+        "crop": crop,
+        "chunk_seconds": chunk_seconds,
+        "chunk_warmup": CHUNK_WARMUP_SECONDS if chunk_seconds else None,
+    }
+
+
+def resolve_stride(video_path, target_fps=None, stride=1):
+    """Frame stride that brings a video down to roughly ``target_fps``."""
+    if not target_fps:
+        return max(1, stride)
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    cap.release()
+    if not fps:
+        return max(1, stride)
+    return max(1, int(round(fps / target_fps)))
+
+
+def pose_cache_key(video_path, settings):
+    return make_key(file_digest(video_path), settings)
+
+
+def load_cached_poses(video_path, settings):
+    cached = pose_cache.load_arrays(pose_cache_key(video_path, settings))
+    return PoseSequence(**cached) if cached is not None else None
+
+
+def store_cached_poses(video_path, settings, poses):
+    pose_cache.store_arrays(pose_cache_key(video_path, settings), {
+        "landmarks": poses.landmarks,
+        "detected": poses.detected,
+        "times": poses.times,
+    })
+
+
+def extract_3d_poses(video_path, model_complexity=2, use_cache=True, target_fps=None, stride=1,
+                     adaptive=False, crop=False):
+    """Run pose estimation over a video, or return cached poses for it.
+
+    ``target_fps`` (or an explicit ``stride``) limits inference to every n-th
+    frame; with ``adaptive`` the skipped frames are still inferred wherever
+    inter-frame motion is high. Timestamps always come from the decoder, so
+    the returned ``times`` may be non-uniform.
+
+    With ``crop`` each frame is cropped around the athlete and downscaled
+    before inference (see ``PersonCrop``); landmarks are still returned in
+    normalized full-frame coordinates.
+    """
+    settings = extractor_settings(model_complexity, resolve_stride(video_path, target_fps, stride), adaptive,
+                                  crop=crop)
+    if use_cache:
+        cached = load_cached_poses(video_path, settings)
+        if cached is not None:
+            return cached
+
+    poses = run_pose_model(video_path, settings)
+
+    if use_cache:
+        store_cached_poses(video_path, settings, poses)
+    return poses
+
+
+def extract_3d_poses_many(video_paths, model_complexity=2, use_cache=True, chunk_seconds=None,
+                          target_fps=None, stride=1, adaptive=False, crop=False):
+    """Extract several videos at once in the shared process pool.
+
+    With ``chunk_seconds`` set, videos longer than that are also split into
+    time ranges that run in separate workers (see ``plan_chunks``), so one
+    long upload can use the whole pool. Cache lookups and writes stay in the
+    calling process so the hit/miss counters remain accurate; only the
+    MediaPipe runs go to workers.
+    """
+    settings = [
+        extractor_settings(model_complexity, resolve_stride(path, target_fps, stride), adaptive, chunk_seconds, crop)
+        for path in video_paths
+    ]
+    results = [
+        load_cached_poses(path, path_settings) if use_cache else None
+        for path, path_settings in zip(video_paths, settings)
+    ]
+    pending = {}
+    for i, path in enumerate(video_paths):
+        if results[i] is not None:
+            continue
+        chunks = plan_chunks(path, chunk_seconds) if chunk_seconds else [(0, None, 0)]
+        pending[i] = [
+            parallel.submit(run_pose_model, path, settings[i], start, stop, warmup)
+            for start, stop, warmup in chunks
+        ]
+    for i, futures in pending.items():
+        results[i] = PoseSequence.concatenate(parallel.gather(futures))
+        if use_cache:
+            store_cached_poses(video_paths[i], settings[i], results[i])
+    return results
+
+
+def extract_poses(video_paths, parallel=False, chunk_seconds=None, **sampling):
+    """Poses for each of ``video_paths``, in the process pool if ``parallel``.
+
+    ``chunk_seconds`` only applies in the pool.
+    """
+    if parallel:
+        return extract_3d_poses_many(video_paths, chunk_seconds=chunk_seconds, **sampling)
+    return [extract_3d_poses(path, **sampling) for path in video_paths]
+
+
+def extract_3d_poses_chunked(video_path, chunk_seconds, model_complexity=2, use_cache=True, **sampling):
+    return extract_3d_poses_many([video_path], model_complexity, use_cache, chunk_seconds, **sampling)[0]
+
+
+def plan_chunks(video_path, chunk_seconds, max_chunks=None):
+    """Split a video into ``(start_frame, stop_frame, warmup_frames)`` ranges.
+
+    Chunks are about ``chunk_seconds`` long, capped at the pool size, and the
+    last one runs to the end of the stream since CAP_PROP_FRAME_COUNT is only
+    an estimate for some containers.
+    """
+    cap = cv2.VideoCapture(video_path)
+    frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    cap.release()
+
+    max_chunks = max_chunks or parallel.POOL_SIZE
+    n_chunks = int(np.ceil(frame_count / (chunk_seconds * fps))) if frame_count > 0 else 1
+    n_chunks = max(1, min(n_chunks, max_chunks, frame_count // MIN_CHUNK_FRAMES))
+    if n_chunks == 1:
+        return [(0, None, 0)]
+
+    warmup = int(round(CHUNK_WARMUP_SECONDS * fps))
+    bounds = np.linspace(0, frame_count, n_chunks + 1).astype(int)
+    return [
+        (int(start), int(stop) if k < n_chunks - 1 else None, min(warmup, int(start)))
+        for k, (start, stop) in enumerate(zip(bounds[:-1], bounds[1:]))
+    ]
+
+
+def stream_3d_poses(video_path, model_complexity=2, use_cache=True, target_fps=None, stride=1,
+                    adaptive=False, crop=False, block_size=STREAM_BLOCK_SIZE):
+    """Yield poses as ``PoseSequence`` blocks of up to ``block_size`` frames.
+
+    Only one block is held at a time, so memory stays flat however long the
+    video is. Stop early by breaking out of the loop (or calling ``close()``);
+    the capture and estimator are released straight away. Cached poses are
+    streamed from the cache, but a streamed run is not written back to it.
+    """
+    settings = extractor_settings(model_complexity, resolve_stride(video_path, target_fps, stride), adaptive,
+                                  crop=crop)
+    cached = load_cached_poses(video_path, settings) if use_cache else None
+    if cached is not None:
+        for start in range(0, len(cached), block_size):
+            yield cached[start:start + block_size]
+        return
+    yield from iter_pose_blocks(video_path, settings, block_size=block_size)
+
+
+def run_pose_model(video_path, settings, start_frame=0, stop_frame=None, warmup_frames=0):
+    """Run MediaPipe over frames ``[start_frame, stop_frame)`` of a video."""
+    return PoseSequence.concatenate(list(iter_pose_blocks(video_path, settings, start_frame, stop_frame,
+                                                          warmup_frames)))
+
+
+def iter_pose_blocks(video_path, settings, start_frame=0, stop_frame=None, warmup_frames=0,
+                     block_size=STREAM_BLOCK_SIZE):
+    """Run MediaPipe over frames ``[start_frame, stop_frame)``, yielding blocks.
+
+    The tracker starts ``warmup_frames`` earlier; those frames are processed
+    but not returned. The last block carries the run's metrics.
+    """
+    cap = cv2.VideoCapture(video_path)
+    first_frame = max(0, start_frame - warmup_frames)
+    if first_frame:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, first_frame)
+
+    block = _new_block(block_size)
+    filled = 0
+
+    # Decoding runs on a background thread so it overlaps inference. When
+    # cropping, colour conversion happens after the crop, on the small image.
+    person_crop = PersonCrop() if settings["crop"] else None
+    crop_resets = 0
+    try:
+        with estimator_pool.checkout(settings["complexity"]) as lease, \
+                FramePipeline(cap, first_frame, stop_frame, settings["stride"], settings["adaptive"],
+                              convert=person_crop is None) as frames:
+            pose = lease.estimator
+            for frame_index, time_sec, image in frames:
+                rgb = person_crop.prepare(image) if person_crop is not None else image
+                result = pose.process(rgb)
+                row, found = landmarks_to_array(result)
+                if person_crop is not None:
+                    if found:
+                        person_crop.to_full_frame(row)
+                    if person_crop.update(row, found):
+                        # Re-detect on the next frame rather than track a region from the old crop
+                        pose.reset()
+                        crop_resets += 1
+
+                if frame_index < start_frame:
+                    continue
+                block.landmarks[filled] = row
+                block.detected[filled] = found
+                block.times[filled] = time_sec
+                filled += 1
+                if filled == block_size:
+                    yield block
+                    block = _new_block(block_size)
+                    filled = 0
+
+        tail = block[:filled]
+        tail.metrics = {
+            **frames.stats.as_dict(),
+            "crop_resets": crop_resets,
+            "estimator_checkouts": 1,
+            "estimator_warm_checkouts": int(lease.cold_start_seconds == 0),
+            "estimator_wait_seconds": lease.wait_seconds,
+            "estimator_cold_start_seconds": lease.cold_start_seconds,
+        }
+        yield tail
+    finally:
+        cap.release()
+
+
+def _new_block(size):
+    return PoseSequence(
+        landmarks=np.zeros((size, NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32),
+        detected=np.zeros(size, dtype=bool),
+        times=np.zeros(size, dtype=np.float64),
+    )
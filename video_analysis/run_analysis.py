@@ -1,128 +1,143 @@
-import shutil
-import os
-import uuid
-from datetime import datetime
-from video_analysis.pose_extraction import extract_3d_poses
-from video_analysis.angle_analysis import compute_joint_angles
-from video_analysis.time_alignment import compute_dtw_mapping, remap_sequence_by_dtw
-from video_analysis.plotting import plot_joint_angles, plot_dtw_mapping
-from video_analysis.middle_frame import save_middle_frame
-from video_analysis.llm import generate_athlete_feedback
-
-import cv2
-
-def copy_video(input_path, output_path):
-    # Open the input video
-    cap = cv2.VideoCapture(input_path)
-    if not cap.isOpened():
-        raise IOError(f"Cannot open video file: {input_path}")
-
-    # Get video properties
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # Or use 'XVID', 'MJPG', etc.
-    fps = cap.get(cv2.CAP_PROP_FPS)
-    width  = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
-    # Create the VideoWriter
-    out = cv2.VideoWriter(output_path, fourcc, fps, (width, height))
-
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        out.write(frame)
-
-    cap.release()
-    out.release()
-    print(f"Video saved to {output_path}")
-
-
-def run_analysis(sport, technique, movement_key, user_video_path, comp_video_path, selected_joints):
-    # Base directory to save results
-    base_results_dir = "media/results"
-    os.makedirs(base_results_dir, exist_ok=True)
-
-    # Create a unique subdirectory for this run
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    unique_id = uuid.uuid4().hex[:6]  # Optional: short UUID fragment
-    output_dir = os.path.join(base_results_dir, f"{timestamp}_{unique_id}")
-    os.makedirs(output_dir, exist_ok=True)
-
-    user_video_path = os.path.join(output_dir, "user_video.mp4")
-    comparison_video_path = os.path.join(output_dir, "comparison_video.mp4")
-    copy_video(user_path, user_video_path)
-    copy_video(comp_path, comparison_video_path)
-
-    # Pose extraction
-    user_poses = extract_3d_poses(user_video_path)
-    comp_poses = extract_3d_poses(comp_video_path)
-
-    # Joint angles
-    user_angles = compute_joint_angles(user_poses, selected_joints)
-    comp_angles = compute_joint_angles(comp_poses, selected_joints)
-
-    angle_plots = {}
-    aligned_plots = {}
-    dtw_plots = {}
-
-    for joint in selected_joints:
-        joint_key = joint.value  # Convert Enum to string key
-
-        if not user_angles[joint] or not comp_angles[joint]:
-            print("[DEBUG] User Angles:", list(user_angles.keys()))
-            print("[DEBUG] Comp Angles:", list(comp_angles.keys()))
-            print("[DEBUG] Selected Joints:", selected_joints)
-            raise ValueError(f"No angle data for joint {joint_key}")
-
-        dtw_mapping = compute_dtw_mapping(user_angles[joint], comp_angles[joint])
-        remapped = remap_sequence_by_dtw(dtw_mapping, user_angles[joint], len(comp_angles[joint]))
-
-        raw_path = os.path.join(output_dir, f"{joint_key}_raw.png")
-        aligned_path = os.path.join(output_dir, f"{joint_key}_aligned.png")
-        dtw_plot_path = os.path.join(output_dir, f"{joint_key}_dtw.png")
-
-        plot_joint_angles(user_angles[joint], comp_angles[joint], raw_path, title=f"{joint_key} (Raw)")
-        plot_joint_angles(remapped, comp_angles[joint], aligned_path, title=f"{joint_key} (Aligned)")
-        plot_dtw_mapping(dtw_mapping, dtw_plot_path)
-
-        angle_plots[joint_key] = raw_path
-        aligned_plots[joint_key] = aligned_path
-        dtw_plots[joint_key] = dtw_plot_path
-
-    # Save middle frame stills
-    user_image = os.path.join(output_dir, "user_middle.jpg")
-    comp_image = os.path.join(output_dir, "comp_middle.jpg")
-    save_middle_frame(user_video_path, user_image)
-    save_middle_frame(comp_video_path, comp_image)
-
-    # Prepare feedback
-    plot_paths = {
-        joint.value: {
-            "raw_plot": angle_plots[joint.value],
-        }
-        for joint in selected_joints
-    }
-
-    feedback = generate_athlete_feedback(
-        sport=sport,
-        technique=technique,
-        joints=[j.value for j in selected_joints],
-        plot_paths=plot_paths,
-        user_video_path=user_video_path,
-        comp_video_path=comp_video_path
-    )
-
-    result = {
-        "angle_plots": angle_plots,
-        "aligned_plots": aligned_plots,
-        "dtw_plots": dtw_plots,
-        "user_image": user_image.replace("media/", "", 1),
-        "comp_image": comp_image.replace("media/", "", 1),
-        "user_video": user_video_path.replace("media/", "", 1),
-        "comp_video": comparison_video_path.replace("media/", "", 1),
-        "llm_feedback": feedback,
-    }
-    
-    print(result)
-
+import os
+import uuid
+from datetime import datetime
+from video_analysis.pose_extraction import extract_poses, pose_cache
+from video_analysis.angle_analysis import compute_joint_angles
+from video_analysis.joints import JOINTS
+from video_analysis.time_alignment import (
+    align_joint_angles, common_rate, dtw_cache, remap_multiple_by_dtw, to_uniform_time_base
+)
+from video_analysis.plotting import get_renderer
+from video_analysis.run_plots import ANGLES_FILE, save_run_angles
+from video_analysis.series import SERIES_FILE, build_series, write_series
+from video_analysis.smoothing import DEFAULT_SMOOTHING, sample_rate, smooth_joint_angles
+from video_analysis.middle_frame import save_middle_frame
+from video_analysis.llm import generate_athlete_feedback
+from video_analysis.estimator_pool import estimator_pool, lease_metrics
+from video_analysis.media_ingest import ingest_video
+
+
+def run_analysis(sport, technique, movement_key, user_video_path, comp_video_path, selected_joints,
+                 parallel=False, chunk_seconds=None, target_fps=None, adaptive=False,
+                 crop=False, joint_weights=None, smoothing=DEFAULT_SMOOTHING, dtw_constraint=None,
+                 dtw_band_width=None):
+    # Fail before any pose inference if a joint has no landmark definition
+    JOINTS.require(selected_joints)
+
+    # Base directory to save results
+    base_results_dir = "media/results"
+    os.makedirs(base_results_dir, exist_ok=True)
+
+    # Create a unique subdirectory for this run
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    unique_id = uuid.uuid4().hex[:6]  # Optional: short UUID fragment
+    output_dir = os.path.join(base_results_dir, f"{timestamp}_{unique_id}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Link or remux the inputs into the run directory; everything below uses the copies
+    user_copy = os.path.join(output_dir, "user_video.mp4")
+    comp_copy = os.path.join(output_dir, "comparison_video.mp4")
+    ingest = {
+        "user": ingest_video(user_video_path, user_copy),
+        "comp": ingest_video(comp_video_path, comp_copy),
+    }
+    user_video_path, comp_video_path = user_copy, comp_copy
+
+    # Pose extraction
+    user_poses, comp_poses = extract_poses([user_video_path, comp_video_path], parallel, chunk_seconds,
+                                           target_fps=target_fps, adaptive=adaptive, crop=crop)
+
+    # Joint angles on one shared time step, so DTW and the plots can index
+    # both clips by sample; never finer than either clip was sampled
+    rate = common_rate(target_fps, user_poses.times, comp_poses.times)
+    user_angles = to_uniform_time_base(user_poses.times, compute_joint_angles(user_poses, selected_joints), rate)
+    comp_angles = to_uniform_time_base(comp_poses.times, compute_joint_angles(comp_poses, selected_joints), rate)
+
+    for joint in selected_joints:
+        if not user_angles[joint] or not comp_angles[joint]:
+            print("[DEBUG] User Angles:", list(user_angles.keys()))
+            print("[DEBUG] Comp Angles:", list(comp_angles.keys()))
+            print("[DEBUG] Selected Joints:", selected_joints)
+            raise ValueError(f"No angle data for joint {joint.value}")
+
+    # Smoothed once; DTW, the plots and the chart data all use these series
+    user_angles = smooth_joint_angles(user_angles, selected_joints, smoothing,
+                                      sample_rate(user_poses.times, len(user_angles[selected_joints[0]])))
+    comp_angles = smooth_joint_angles(comp_angles, selected_joints, smoothing,
+                                      sample_rate(comp_poses.times, len(comp_angles[selected_joints[0]])))
+
+    # One warping path for the whole movement, shared by every joint
+    dtw_mapping = align_joint_angles(user_angles, comp_angles, selected_joints, joint_weights,
+                                     constraint=dtw_constraint, band_width=dtw_band_width)
+    comp_len = len(comp_angles[selected_joints[0]])
+    remapped_angles = remap_multiple_by_dtw(
+        dtw_mapping, {joint: user_angles[joint] for joint in selected_joints}, comp_len)
+
+    # Chart data for the results page, drawn client-side
+    series_path = os.path.join(output_dir, SERIES_FILE)
+    write_series(build_series(selected_joints, user_angles, comp_angles, remapped_angles, dtw_mapping),
+                 series_path)
+
+    # Everything needed to draw the remaining plots on request (see run_plots)
+    save_run_angles(os.path.join(output_dir, ANGLES_FILE), selected_joints,
+                    user_angles, comp_angles, remapped_angles, dtw_mapping)
+
+    # Only the raw plots are rendered up front, since they go to the LLM
+    renderer = get_renderer()
+    angle_plots = {}
+
+    for joint in selected_joints:
+        joint_key = joint.value  # Convert Enum to string key
+        label = JOINTS.spec(joint).label
+
+        raw_path = os.path.join(output_dir, f"{joint_key}_raw.png")
+        renderer.render_joint_angles(user_angles[joint], comp_angles[joint], raw_path, title=f"{label} (Raw)")
+        angle_plots[joint_key] = raw_path
+
+    # Save middle frame stills
+    user_image = os.path.join(output_dir, "user_middle.jpg")
+    comp_image = os.path.join(output_dir, "comp_middle.jpg")
+    save_middle_frame(user_video_path, user_image)
+    save_middle_frame(comp_video_path, comp_image)
+
+    # Prepare feedback
+    plot_paths = {
+        joint.value: {
+            "raw_plot": angle_plots[joint.value],
+        }
+        for joint in selected_joints
+    }
+
+    feedback = generate_athlete_feedback(
+        sport=sport,
+        technique=technique,
+        joints=[j.value for j in selected_joints],
+        plot_paths=plot_paths,
+        user_video_path=user_video_path,
+        comp_video_path=comp_video_path
+    )
+
+    result = {
+        "angle_plots": angle_plots,
+        "series": series_path.replace("media/", "", 1),
+        "user_image": user_image.replace("media/", "", 1),
+        "comp_image": comp_image.replace("media/", "", 1),
+        "user_video": user_video_path.replace("media/", "", 1),
+        "comp_video": comp_video_path.replace("media/", "", 1),
+        "llm_feedback": feedback,
+        "metrics": {
+            "ingest": ingest,
+            "pose_cache": pose_cache.stats(),
+            "user_extraction": user_poses.metrics,
+            "comp_extraction": comp_poses.metrics,
+            "estimator_leases": lease_metrics(user_poses.metrics, comp_poses.metrics),
+            "dtw_cache": dtw_cache.stats(),
+        },
+    }
+    if not parallel:
+        # In parallel mode inference runs in the workers' pools and this one sits idle
+        result["metrics"]["estimator_pool"] = estimator_pool.metrics()
+    
+    print(result)
+
     return result
\ No newline at end of file
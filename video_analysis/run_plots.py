@@ -0,0 +1,76 @@
+"""On-demand PNG plots for a finished run.
+
+``run_analysis`` stores the run's angle series in ``angles.npz`` rather than
+rendering every plot up front. A plot is drawn the first time it is asked
+for and kept in a size-capped disk cache, keyed by the content of that file.
+
+Plot names follow the files the pipeline used to write: ``<joint>_raw``,
+``<joint>_aligned``, ``dtw`` and ``summary``.
+"""
+import io
+import os
+
+import numpy as np
+
+from video_analysis.cache import DiskCache, file_digest, make_key
+from video_analysis.joints import JOINTS
+from video_analysis.plotting import get_renderer
+from video_analysis.types import Joint
+
+ANGLES_FILE = "angles.npz"
+PLOT_CACHE_DIR = "media/cache/plots"
+PLOT_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+plot_cache = DiskCache(PLOT_CACHE_DIR, PLOT_CACHE_MAX_BYTES)
+
+
+def as_array(seq):
+    return np.array([np.nan if v is None else v for v in seq], dtype=np.float32)
+
+
+def save_run_angles(path, joints, user_angles, comp_angles, aligned_angles, dtw_path):
+    """Write what the plots need: per-joint user, comparison and aligned series plus the DTW path."""
+    arrays = {"joints": np.array([joint.value for joint in joints]), "dtw": np.asarray(dtw_path, dtype=np.int32)}
+    for joint in joints:
+        arrays[f"user.{joint.value}"] = as_array(user_angles[joint])
+        arrays[f"comp.{joint.value}"] = as_array(comp_angles[joint])
+        arrays[f"aligned.{joint.value}"] = as_array(aligned_angles[joint])
+    np.savez(path, **arrays)
+
+
+def render_plot(angles, name, output):
+    """Draw plot ``name`` from loaded ``angles`` into ``output``. Raises ``KeyError`` for unknown names."""
+    renderer = get_renderer()
+    joints = [str(key) for key in angles["joints"]]
+    if name == "dtw":
+        renderer.render_dtw_mapping(angles["dtw"], output)
+    elif name == "summary":
+        panels = [(JOINTS.spec(Joint(key)).label, angles[f"user.{key}"], angles[f"comp.{key}"],
+                   angles[f"aligned.{key}"]) for key in joints]
+        renderer.render_summary(panels, angles["dtw"], output)
+    else:
+        key, _, kind = name.rpartition("_")
+        if key not in joints or kind not in ("raw", "aligned"):
+            raise KeyError(name)
+        user = angles[f"user.{key}"] if kind == "raw" else angles[f"aligned.{key}"]
+        label = JOINTS.spec(Joint(key)).label
+        renderer.render_joint_angles(user, angles[f"comp.{key}"], output, title=f"{label} ({kind.title()})")
+
+
+def run_plot(results_dir, name):
+    """PNG bytes of plot ``name`` for the run in ``results_dir``, rendered on first request.
+
+    Raises ``FileNotFoundError`` if the run has no stored angles and
+    ``KeyError`` for an unknown plot name.
+    """
+    angles_path = os.path.join(results_dir, ANGLES_FILE)
+    key = make_key("plot", file_digest(angles_path), name)
+    png = plot_cache.load_bytes(key, ".png")
+    if png is None:
+        with np.load(angles_path) as data:
+            angles = {field: data[field] for field in data.files}
+        output = io.BytesIO()
+        render_plot(angles, name, output)
+        png = output.getvalue()
+        plot_cache.store_bytes(key, png, ".png")
+    return png
@@ -0,0 +1,71 @@
+"""Chart data for a run: angle series and the DTW path as compact JSON.
+
+The results page draws these in the browser instead of loading one PNG per
+plot. Lines arrive already smoothed (see ``smoothing``) and are thinned to
+about ``SERIES_MAX_POINTS`` points, keeping each bucket's minimum and
+maximum so peaks survive the downsampling.
+"""
+import json
+
+import numpy as np
+
+from video_analysis.joints import JOINTS
+
+SERIES_FILE = "series.json"
+# Points kept per line; charts are at most a few hundred pixels wide
+SERIES_MAX_POINTS = 600
+
+
+def min_max_indices(values, max_points):
+    """Sorted indices keeping the min and max of ``max_points / 2`` buckets, plus both ends."""
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    buckets = max_points // 2
+    size = -(-n // buckets)
+    padded = np.full(buckets * size, np.nan)
+    padded[:n] = values
+    rows = padded.reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    low = offsets + np.argmin(np.where(np.isnan(rows), np.inf, rows), axis=1)
+    high = offsets + np.argmax(np.where(np.isnan(rows), -np.inf, rows), axis=1)
+    return np.unique(np.concatenate(([0, n - 1], low, high)).clip(0, n - 1))
+
+
+def line(values, max_points=SERIES_MAX_POINTS):
+    """``{"x": frames, "y": angles}`` for one downsampled line; missing samples are null."""
+    y = np.array([np.nan if v is None else v for v in values], dtype=float)
+    idx = min_max_indices(y, max_points)
+    return {
+        "x": idx.tolist(),
+        "y": [None if np.isnan(v) else round(float(v), 1) for v in y[idx]],
+    }
+
+
+def path_line(path, max_points=SERIES_MAX_POINTS):
+    """The DTW path as ``{"x": user frames, "y": pro frames}``, evenly thinned."""
+    steps = np.asarray(path).reshape(-1, 2)
+    idx = np.unique(np.linspace(0, len(steps) - 1, min(len(steps), max_points)).round().astype(int))
+    return {"x": steps[idx, 0].tolist(), "y": steps[idx, 1].tolist()}
+
+
+def build_series(joints, user_angles, comp_angles, aligned_angles, dtw_path, max_points=SERIES_MAX_POINTS):
+    """Everything the results charts need. Aligned user lines share the comparison's frame axis."""
+    return {
+        "joints": [
+            {
+                "key": joint.value,
+                "label": JOINTS.spec(joint).label,
+                "user": line(user_angles[joint], max_points),
+                "comp": line(comp_angles[joint], max_points),
+                "aligned": line(aligned_angles[joint], max_points),
+            }
+            for joint in joints
+        ],
+        "dtw": path_line(dtw_path, max_points),
+    }
+
+
+def write_series(series, path):
+    with open(path, "w") as f:
+        json.dump(series, f, separators=(",", ":"), allow_nan=False)
@@ -0,0 +1,175 @@
+"""Smoothing for joint angle series.
+
+Every filter takes a ``(frames, joints)`` matrix, or a single series, and
+treats NaN as a missing sample. Missing samples never pull the result toward
+some global value. A gap shorter than the window is bridged from its
+neighbours, and a longer gap stays NaN. ``run_analysis`` smooths each video
+once, and DTW, the plots and the chart data all use the result.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+SMOOTHING_METHODS = ("moving_average", "savitzky_golay", "one_euro")
+DEFAULT_SMOOTHING = "moving_average"
+# Frames per window, centred on the output frame
+SMOOTHING_WINDOW = 15
+SAVGOL_ORDER = 2
+# One-Euro parameters: cutoffs in Hz, beta per degree/second of speed
+ONE_EURO_MIN_CUTOFF = 1.0
+ONE_EURO_BETA = 0.05
+ONE_EURO_D_CUTOFF = 1.0
+
+
+def as_matrix(x) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    return x[:, None] if x.ndim == 1 else x
+
+
+def shaped_like(result: np.ndarray, x) -> np.ndarray:
+    return result[:, 0] if np.ndim(x) == 1 else result
+
+
+def window_sums(values: np.ndarray, half: int) -> np.ndarray:
+    """Sum over ``[i - half, i + half]`` (clipped to the series) for every row, via one cumsum."""
+    n = len(values)
+    sums = np.zeros((n + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=sums[1:])
+    idx = np.arange(n)
+    return sums[np.minimum(idx + half + 1, n)] - sums[np.maximum(idx - half, 0)]
+
+
+def moving_average(x, window: int = SMOOTHING_WINDOW) -> np.ndarray:
+    """Centred mean of the valid samples in each window, in O(n).
+
+    Near the ends the window shrinks instead of padding. NaN samples add
+    nothing to the sum or the count. A window without valid samples gives
+    NaN.
+    """
+    m = as_matrix(x)
+    valid = ~np.isnan(m)
+    sums = window_sums(np.where(valid, m, 0.0), window // 2)
+    counts = window_sums(valid.astype(np.float64), window // 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return shaped_like(sums / counts, x)
+
+
+def fill_gaps(m: np.ndarray) -> np.ndarray:
+    """Linearly interpolate NaN runs per column, holding the end values. All-NaN columns stay NaN."""
+    filled = m.copy()
+    frames = np.arange(len(m))
+    for column in filled.T:
+        valid = ~np.isnan(column)
+        if valid.any() and not valid.all():
+            column[~valid] = np.interp(frames[~valid], frames[valid], column[valid])
+    return filled
+
+
+def savgol_projection(window: int, order: int) -> np.ndarray:
+    """Rows map a window of samples to the least-squares polynomial fit at each of its positions."""
+    offsets = np.arange(window) - window // 2
+    vander = offsets[:, None] ** np.arange(order + 1)
+    return vander @ np.linalg.pinv(vander)
+
+
+def savitzky_golay(x, window: int = SMOOTHING_WINDOW, order: int = SAVGOL_ORDER) -> np.ndarray:
+    """Savitzky-Golay filter: keeps peak height and width better than a moving average.
+
+    Short gaps are interpolated before fitting. The ends use the polynomial
+    fitted to the first and last window rather than padding. Samples whose
+    window holds no valid data stay NaN, as in ``moving_average``.
+    """
+    m = as_matrix(x)
+    n = len(m)
+    window = min(window, n if n % 2 else n - 1)
+    if window <= order + 1:
+        return shaped_like(m.copy(), x)
+    half = window // 2
+    projection = savgol_projection(window, order)
+    filled = fill_gaps(m)
+    out = np.empty_like(filled)
+    out[half:n - half] = sliding_window_view(filled, window, axis=0) @ projection[half]
+    out[:half] = projection[:half] @ filled[:window]
+    out[n - half:] = projection[half + 1:] @ filled[n - window:]
+    covered = window_sums((~np.isnan(m)).astype(np.float64), half) > 0
+    out[~covered] = np.nan
+    return shaped_like(out, x)
+
+
+def smoothing_factor(cutoff, elapsed):
+    tau = 1.0 / (2 * np.pi * cutoff)
+    return 1.0 / (1.0 + tau / elapsed)
+
+
+def one_euro(x, rate: float, min_cutoff: float = ONE_EURO_MIN_CUTOFF, beta: float = ONE_EURO_BETA,
+             d_cutoff: float = ONE_EURO_D_CUTOFF) -> np.ndarray:
+    """One-Euro filter (Casiez et al., 2012) at ``rate`` samples per second.
+
+    The cutoff rises with the filtered speed. Slow phases are smoothed
+    heavily and fast swings follow with little lag. The filter is causal, so
+    it runs frame by frame, vectorized across joints. After a gap the state
+    resumes with the elapsed time of the whole gap.
+    """
+    m = as_matrix(x)
+    out = np.full_like(m, np.nan)
+    value = np.full(m.shape[1], np.nan)
+    speed = np.zeros(m.shape[1])
+    elapsed = np.ones(m.shape[1])
+    for i, row in enumerate(m):
+        valid = ~np.isnan(row)
+        started = valid & ~np.isnan(value)
+        dt = elapsed / rate
+        raw_speed = np.where(started, (row - value) / dt, 0.0)
+        speed = np.where(valid, speed + smoothing_factor(d_cutoff, dt) * (raw_speed - speed), speed)
+        alpha = smoothing_factor(min_cutoff + beta * np.abs(speed), dt)
+        value = np.where(started, value + alpha * (row - value), np.where(valid, row, value))
+        out[i, valid] = value[valid]
+        elapsed = np.where(valid, 1.0, elapsed + 1.0)
+    return shaped_like(out, x)
+
+
+def smooth(x, method: str = DEFAULT_SMOOTHING, rate: Optional[float] = None) -> np.ndarray:
+    """Apply one of ``SMOOTHING_METHODS`` with the module's default parameters."""
+    if method == "moving_average":
+        return moving_average(x)
+    if method == "savitzky_golay":
+        return savitzky_golay(x)
+    if method == "one_euro":
+        if rate is None:
+            raise ValueError("One-Euro smoothing needs the sample rate")
+        return one_euro(x, rate)
+    raise ValueError(f"Unknown smoothing method: {method}")
+
+
+def smoothing_params(method: str = DEFAULT_SMOOTHING) -> Dict:
+    """The parameters ``smooth`` uses for ``method``, for cache keys of smoothed data."""
+    params = {
+        "moving_average": {"window": SMOOTHING_WINDOW},
+        "savitzky_golay": {"window": SMOOTHING_WINDOW, "order": SAVGOL_ORDER},
+        "one_euro": {"min_cutoff": ONE_EURO_MIN_CUTOFF, "beta": ONE_EURO_BETA, "d_cutoff": ONE_EURO_D_CUTOFF},
+    }
+    if method not in params:
+        raise ValueError(f"Unknown smoothing method: {method}")
+    return {"method": method, **params[method]}
+
+
+def sample_rate(times: np.ndarray, frames: int) -> float:
+    """Samples per second of a ``frames``-long series spanning ``times`` (see ``to_uniform_time_base``)."""
+    span = float(times[-1] - times[0]) if len(times) else 0.0
+    return (frames - 1) / span if frames > 1 and span > 0 else 1.0
+
+
+def smooth_joint_angles(
+    angles: Dict,
+    joints: List,
+    method: str = DEFAULT_SMOOTHING,
+    rate: Optional[float] = None
+) -> Dict:
+    """Smooth every joint's series in one call. Returns lists with None for missing samples."""
+    m = np.array([[np.nan if v is None else v for v in angles[joint]] for joint in joints], dtype=np.float64).T
+    smoothed = smooth(m, method, rate)
+    return {
+        joint: [None if np.isnan(v) else v for v in column]
+        for joint, column in zip(joints, smoothed.T.tolist())
+    }
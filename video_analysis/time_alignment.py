@@ -1,70 +1,581 @@
-import os
-from typing import Dict, List, Optional, Tuple
-import numpy as np
-
-
-def clean(seq: List[Optional[float]]) -> np.ndarray:
-    arr = np.array(seq, dtype=np.float32)
-    mask = np.isnan(arr) | np.isinf(arr)
-    if np.all(mask):
-        return np.zeros_like(arr)
-    arr[mask] = np.nanmean(arr[~mask])
-    return arr
-
-
-def z_normalize(x: np.ndarray) -> np.ndarray:
-    return (x - np.mean(x)) / (np.std(x) + 1e-8)
-
-
-def compute_dtw_mapping(
-    seq1: List[Optional[float]],
-    seq2: List[Optional[float]]
-) -> List[Tuple[int, int]]:
-    x = z_normalize(clean(seq1))
-    y = z_normalize(clean(seq2))
-    n, m = len(x), len(y)
-
-    cost = np.full((n + 1, m + 1), np.inf)
-    cost[0, :] = 0  # allow match to start anywhere
-    for i in range(1, n + 1):
-        for j in range(1, m + 1):
-            dist = abs(x[i - 1] - y[j - 1])
-            cost[i, j] = dist + min(cost[i - 1, j], cost[i, j - 1], cost[i - 1, j - 1])
-
-    end_j = int(np.argmin(cost[-1]))
-    path = []
-    i, j = n, end_j
-    while i > 0 and j > 0:
-        path.append((int(i - 1), int(j - 1)))
-        moves = [(i - 1, j), (i, j - 1), (i - 1, j - 1)]
-        costs = [cost[m] if m[0] >= 0 and m[1] >= 0 else np.inf for m in moves]
-        i, j = moves[np.argmin(costs)]
-    path.reverse()
-    return path
-
-
-def remap_sequence_by_dtw(
-    mapping: List[Tuple[int, int]],
-    seq: List[Optional[float]],
-    target_len: int
-) -> List[Optional[float]]:
-    remap = {j: [] for j in range(target_len)}  # ensure all keys exist
-    for i, j in mapping:
-        if seq[i] is not None:
-            remap[j].append(seq[i])
-
-    return [
-        float(np.nanmean(remap[j])) if remap[j] else None
-        for j in range(target_len)
-    ]
-
-
-def remap_multiple_by_dtw(
-    mapping: List[Tuple[int, int]],
-    angles: Dict[str, List[Optional[float]]],
-    target_len: int
-) -> Dict[str, List[Optional[float]]]:
-    return {
-        joint: remap_sequence_by_dtw(mapping, angle_seq, target_len)
-        for joint, angle_seq in angles.items()
-    }
+import os
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from video_analysis.cache import DiskCache, TieredCache, array_digest, make_key
+
+# Above this many cost-matrix cells, run_analysis switches to multiresolution DTW
+EXACT_DTW_MAX_CELLS = 4_000_000
+FASTDTW_RADIUS = 30
+# Up to this many cells exact DTW still runs, with O(sqrt(n) * m) memory
+LINEAR_DTW_MAX_CELLS = 400_000_000
+
+DTW_CACHE_DIR = "media/cache/dtw"
+DTW_CACHE_MAX_BYTES = 64 * 1024 * 1024
+DTW_CACHE_MEMORY_ENTRIES = 128
+
+dtw_cache = TieredCache(DiskCache(DTW_CACHE_DIR, DTW_CACHE_MAX_BYTES), DTW_CACHE_MEMORY_ENTRIES)
+
+
+def clean(seq: List[Optional[float]]) -> np.ndarray:
+    arr = np.array(seq, dtype=np.float32)
+    mask = np.isnan(arr) | np.isinf(arr)
+    if np.all(mask):
+        return np.zeros_like(arr)
+    arr[mask] = np.nanmean(arr[~mask])
+    return arr
+
+
+def z_normalize(x: np.ndarray) -> np.ndarray:
+    return (x - np.mean(x)) / (np.std(x) + 1e-8)
+
+
+def is_uniform(times: np.ndarray, tolerance: float = 0.1) -> bool:
+    if len(times) < 3:
+        return True
+    dt = np.diff(times)
+    step = np.median(dt)
+    return bool(step > 0 and np.all(np.abs(dt - step) <= tolerance * step))
+
+
+def resample_uniform(
+    times: np.ndarray,
+    seq: List[Optional[float]],
+    step: float
+) -> List[Optional[float]]:
+    """Linearly interpolate a series onto a grid starting at ``times[0]``.
+
+    Grid points that are not bracketed by two detected samples stay None.
+    """
+    arr = np.array([np.nan if v is None else v for v in seq], dtype=np.float64)
+    grid = times[0] + step * np.arange(int(np.floor((times[-1] - times[0]) / step)) + 1)
+    valid = ~np.isnan(arr)
+    if not valid.any():
+        return [None] * len(grid)
+    values = np.interp(grid, times[valid], arr[valid])
+    support = np.interp(grid, times, valid.astype(np.float64))
+    return [float(v) if ok >= 1.0 else None for v, ok in zip(values, support)]
+
+
+def clip_rate(times: np.ndarray) -> float:
+    """Samples per second at the median gap between ``times``."""
+    dt = np.diff(times)
+    dt = dt[dt > 0]
+    return 1.0 / float(np.median(dt)) if len(dt) else 1.0
+
+
+def common_rate(target_fps: Optional[float], *time_axes: np.ndarray) -> Optional[float]:
+    """Grid rate for clips compared together: ``target_fps``, capped at the slowest clip's own rate.
+
+    Resampling a 30 fps clip onto a 60 fps grid would only add interpolated
+    samples, doubling each DTW axis and halving the smoothing window's span.
+    """
+    if not target_fps:
+        return None
+    return min([float(target_fps)] + [clip_rate(times) for times in time_axes if len(times) > 1])
+
+
+def to_uniform_time_base(
+    times: np.ndarray,
+    angles: Dict[str, List[Optional[float]]],
+    rate: Optional[float] = None
+) -> Dict[str, List[Optional[float]]]:
+    """Resample strided/adaptively sampled angle series onto a ``1 / rate`` grid.
+
+    DTW and the plots index series by sample, so gaps between samples must be
+    equal, and two clips compared by DTW must share the step. The grid is
+    fixed by ``rate`` (see ``common_rate``), not by how densely adaptive
+    sampling happened to infer, so every clip lands on the same time base.
+    Input already uniform at that step is returned unchanged. Without a
+    ``rate``, non-uniform input is resampled at its median step.
+    """
+    if rate is None:
+        if is_uniform(times):
+            return angles
+        rate = clip_rate(times)
+    step = 1.0 / rate
+    if is_uniform(times) and (len(times) < 2 or abs(np.median(np.diff(times)) - step) <= 0.1 * step):
+        return angles
+    return {joint: resample_uniform(times, seq, step) for joint, seq in angles.items()}
+
+
+def joint_weight_vector(joints: List, weights: Optional[Dict] = None) -> np.ndarray:
+    """Per-joint weights in ``joints`` order, normalized to sum to 1."""
+    w = np.array([1.0 if weights is None else weights.get(joint, 0.0) for joint in joints])
+    if w.sum() <= 0:
+        raise ValueError("Joint weights must not all be zero")
+    return (w / w.sum()).astype(np.float32)
+
+
+def prepare_angle_matrix(
+    angles: Dict[str, List[Optional[float]]],
+    joints: List,
+    weights: Optional[Dict] = None
+) -> np.ndarray:
+    """Stack joint series into a weighted ``(frames, joints)`` DTW input.
+
+    Each column is cleaned and z-normalized on its own, then scaled by its
+    joint's weight (normalized to sum to 1, equal by default). The L1
+    distance between two rows is then the weighted mean of per-joint
+    distances, because ``w * |a - b| == |w * a - w * b|`` for ``w >= 0``.
+    """
+    w = joint_weight_vector(joints, weights)
+    return np.stack([z_normalize(clean(angles[joint])) for joint in joints], axis=1) * w
+
+
+def distance(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """L1 distance between matching samples of 1-D series or feature rows."""
+    d = np.abs(a - b)
+    return d if d.ndim == 1 else d.sum(axis=1)
+
+
+def accumulated_cost(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+    """Open-begin DTW cost matrix of shape ``(n + 1, m + 1)``.
+
+    ``x`` and ``y`` are 1-D series or ``(frames, features)`` matrices.
+
+    Cells on one anti-diagonal (``i + j == k``) only depend on the two
+    previous anti-diagonals, so each diagonal is filled with a few array
+    operations. In the row-major buffer an anti-diagonal is a strided slice
+    with step ``m``, which makes its neighbours plain views as well. Every
+    cell gets exactly the arithmetic of the scalar recurrence, so the matrix
+    (and therefore the path) is identical to a cell-by-cell fill.
+    """
+    n, m = len(x), len(y)
+    cost = np.full((n + 1, m + 1), np.inf)
+    cost[0, :] = 0  # allow match to start anywhere
+    flat = cost.reshape(-1)
+    width = m + 1
+    y_rev = y[::-1]
+    for k in range(2, n + m + 1):
+        i_lo, i_hi = max(1, k - m), min(n, k - 1)
+        if i_lo > i_hi:
+            continue
+        start = i_lo * width + (k - i_lo)
+        stop = i_hi * width + (k - i_hi) + 1
+        up = flat[start - width:stop - width:m]
+        left = flat[start - 1:stop - 1:m]
+        diag = flat[start - width - 1:stop - width - 1:m]
+        dist = distance(x[i_lo - 1:i_hi], y_rev[m - k + i_lo:m - k + i_hi + 1])
+        flat[start:stop:m] = dist + np.minimum(np.minimum(up, left), diag)
+    return cost
+
+
+def backtrack(cost: np.ndarray, end_j: int) -> List[Tuple[int, int]]:
+    path = []
+    i, j = cost.shape[0] - 1, end_j
+    while i > 0 and j > 0:
+        path.append((int(i - 1), int(j - 1)))
+        # Ties go to the first of up, left, diagonal
+        up, left, diag = cost[i - 1, j], cost[i, j - 1], cost[i - 1, j - 1]
+        if up <= left and up <= diag:
+            i -= 1
+        elif left <= diag:
+            j -= 1
+        else:
+            i, j = i - 1, j - 1
+    path.reverse()
+    return path
+
+
+class BandedCost:
+    """DTW cost matrix that only stores cells inside a per-row window.
+
+    Row ``i`` (1-based, like the full matrix) keeps columns
+    ``lo[i] <= j < hi[i]``; everything else reads as ``inf``. Row 0 is
+    implicit: all zeros for an open begin, otherwise only ``(0, 0)`` is 0.
+    Supports ``shape`` and ``[i, j]`` so ``backtrack`` works unchanged.
+    """
+
+    def __init__(self, values: np.ndarray, lo: np.ndarray, hi: np.ndarray, m: int, open_begin: bool):
+        self.values = values
+        self.lo = lo
+        self.hi = hi
+        self.open_begin = open_begin
+        self.shape = (len(lo), m + 1)
+
+    def __getitem__(self, index: Tuple[int, int]) -> float:
+        i, j = index
+        if i == 0:
+            return 0.0 if self.open_begin or j == 0 else np.inf
+        if self.lo[i] <= j < self.hi[i]:
+            return self.values[i, j - self.lo[i]]
+        return np.inf
+
+    def last_row(self) -> Tuple[int, np.ndarray]:
+        i = self.shape[0] - 1
+        return int(self.lo[i]), self.values[i, :self.hi[i] - self.lo[i]]
+
+
+def dtw_row(prev_lo: int, prev: np.ndarray, dist: np.ndarray, lo: int) -> np.ndarray:
+    """One row of the DTW recurrence over columns ``lo .. lo + len(dist) - 1``.
+
+    ``prev`` holds the previous row's costs starting at column ``prev_lo``;
+    columns outside it count as ``inf``. The left-neighbour dependency inside
+    the row is resolved without a Python loop: with ``S`` the running sum of
+    ``dist`` and ``a`` the best of the up/diagonal moves plus ``dist``,
+    ``cost[j] = S[j] + min(a[k] - S[k] for k <= j)``.
+    """
+    hi = lo + len(dist)
+    prev_ext = np.full(len(dist) + 1, np.inf)  # columns lo - 1 .. hi - 1
+    a0, a1 = max(lo - 1, prev_lo), min(hi, prev_lo + len(prev))
+    if a0 < a1:
+        prev_ext[a0 - lo + 1:a1 - lo + 1] = prev[a0 - prev_lo:a1 - prev_lo]
+    a = dist + np.minimum(prev_ext[1:], prev_ext[:-1])
+    running = np.cumsum(dist)
+    return running + np.minimum.accumulate(a - running)
+
+
+def banded_cost(
+    x: np.ndarray,
+    y: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray,
+    open_begin: bool = True
+) -> BandedCost:
+    n, m = len(x), len(y)
+    values = np.full((n + 1, int(np.max(hi[1:] - lo[1:], initial=1))), np.inf)
+    prev_lo, prev = 0, np.zeros(m + 1)
+    if not open_begin:
+        prev[1:] = np.inf
+    for i in range(1, n + 1):
+        dist = distance(x[i - 1], y[lo[i] - 1:hi[i] - 1]).astype(np.float64)
+        row = dtw_row(prev_lo, prev, dist, lo[i])
+        values[i, :len(row)] = row
+        prev_lo, prev = lo[i], row
+    return BandedCost(values, lo, hi, m, open_begin)
+
+
+def sakoe_chiba_window(n: int, m: int, band_width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Columns within ``band_width`` of the scaled diagonal ``j = i * m / n``."""
+    centre = np.arange(n + 1) * m / max(n, 1)
+    lo = np.clip(np.floor(centre - band_width), 1, m).astype(int)
+    hi = np.clip(np.ceil(centre + band_width), 1, m).astype(int) + 1
+    return lo, hi
+
+
+def itakura_window(n: int, m: int, max_slope: float = 2.0) -> Tuple[np.ndarray, np.ndarray]:
+    """Itakura parallelogram: local slopes between ``1 / max_slope`` and ``max_slope``."""
+    u = np.arange(n + 1) / max(n, 1)
+    v_lo = np.maximum(u / max_slope, 1 - max_slope * (1 - u))
+    v_hi = np.minimum(u * max_slope, 1 - (1 - u) / max_slope)
+    lo = np.clip(np.ceil(v_lo * m), 1, m).astype(int)
+    hi = np.clip(np.floor(v_hi * m), 1, m).astype(int) + 1
+    hi = np.maximum(hi, lo + 1)  # keep at least one cell per row
+    return lo, hi
+
+
+def constraint_window(
+    n: int,
+    m: int,
+    constraint: str,
+    band_width: Optional[int] = None,
+    max_slope: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row column window for ``"sakoe_chiba"`` (default width 10% of the longer series) or ``"itakura"``."""
+    if constraint == "sakoe_chiba":
+        width = band_width if band_width is not None else max(1, int(0.1 * max(n, m)))
+        return sakoe_chiba_window(n, m, width)
+    if constraint == "itakura":
+        return itakura_window(n, m, max_slope)
+    raise ValueError(f"Unknown DTW constraint: {constraint}")
+
+
+def constrained_path(
+    x: np.ndarray,
+    y: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray
+) -> Optional[List[Tuple[int, int]]]:
+    """Best path inside the window, or None if the window leaves no complete path."""
+    cost = banded_cost(x, y, lo, hi)
+    end_lo, end_row = cost.last_row()
+    if not np.isfinite(end_row).any():
+        return None
+    return backtrack(cost, end_lo + int(np.argmin(end_row)))
+
+
+def compute_dtw_mapping(
+    seq1: List[Optional[float]],
+    seq2: List[Optional[float]],
+    constraint: Optional[str] = None,
+    band_width: Optional[int] = None,
+    max_slope: float = 2.0
+) -> List[Tuple[int, int]]:
+    """Align ``seq1`` onto ``seq2`` (open begin and end in ``seq2``).
+
+    ``constraint`` limits the search to a Sakoe-Chiba band of ``band_width``
+    frames (``"sakoe_chiba"``, default width 10% of the longer series) or an
+    Itakura parallelogram (``"itakura"``), storing only those cells. If the
+    band leaves no complete path, the full matrix is used instead.
+    """
+    x = z_normalize(clean(seq1))
+    y = z_normalize(clean(seq2))
+    n, m = len(x), len(y)
+
+    if constraint is not None and n and m:
+        lo, hi = constraint_window(n, m, constraint, band_width, max_slope)
+        if np.any(lo[1:] > 1) or np.any(hi[1:] <= m):
+            path = constrained_path(x, y, lo, hi)
+            if path is not None:
+                return path
+
+    cost = accumulated_cost(x, y)
+    return backtrack(cost, int(np.argmin(cost[-1])))
+
+
+class CheckpointedCost:
+    """Full-width DTW cost matrix kept as every ``step``-th row.
+
+    The forward pass holds one row at a time and saves a checkpoint row
+    every ``step`` rows. Reading a row recomputes its block (at most
+    ``step + 1`` rows) from the checkpoint before it. ``backtrack`` walks
+    the rows downwards, so each block is recomputed once. With ``step``
+    about ``sqrt(n)`` this needs O(sqrt(n) * m) memory instead of O(n * m)
+    and about twice the arithmetic.
+    """
+
+    def __init__(self, x: np.ndarray, y: np.ndarray, step: Optional[int] = None):
+        self.x, self.y = x, y
+        n, m = len(x), len(y)
+        self.shape = (n + 1, m + 1)
+        self.step = step or max(1, int(np.sqrt(n)))
+        self.checkpoints = {0: np.zeros(m + 1)}  # open begin
+        row = self.checkpoints[0]
+        for i in range(1, n + 1):
+            row = self.next_row(row, i)
+            if i % self.step == 0:
+                self.checkpoints[i] = row
+        self.last = row
+        self.block_start, self.block = n, row[np.newaxis]
+
+    def next_row(self, prev: np.ndarray, i: int) -> np.ndarray:
+        row = np.empty_like(prev)
+        row[0] = np.inf
+        row[1:] = dtw_row(0, prev, distance(self.x[i - 1], self.y).astype(np.float64), 1)
+        return row
+
+    def __getitem__(self, index: Tuple[int, int]) -> float:
+        i, j = index
+        if not self.block_start <= i < self.block_start + len(self.block):
+            start = max(i - 1, 0) // self.step * self.step
+            stop = min(start + self.step, self.shape[0] - 1)
+            block = np.empty((stop - start + 1, self.shape[1]))
+            block[0] = self.checkpoints[start]
+            for r in range(start + 1, stop + 1):
+                block[r - start] = self.next_row(block[r - start - 1], r)
+            self.block_start, self.block = start, block
+        return self.block[i - self.block_start, j]
+
+
+def linear_memory_path(x: np.ndarray, y: np.ndarray, step: Optional[int] = None) -> List[Tuple[int, int]]:
+    """Exact DTW path without materializing the cost matrix.
+
+    The optimal cost is the same as ``accumulated_cost``. Rows are filled
+    with ``dtw_row``, whose rounding differs in the last bits, so on exact
+    ties the chosen path can differ from the full-matrix one.
+    """
+    cost = CheckpointedCost(x, y, step)
+    return backtrack(cost, int(np.argmin(cost.last)))
+
+
+def coarsen(x: np.ndarray) -> np.ndarray:
+    """Halve the resolution by averaging neighbouring pairs (odd tail kept)."""
+    even = len(x) // 2 * 2
+    half = x[:even].reshape(-1, 2, *x.shape[1:]).mean(axis=1)
+    return np.concatenate([half, x[even:]]) if even < len(x) else half
+
+
+def path_window(path: List[Tuple[int, int]], n: int, m: int, radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-row column window around a coarse path projected to ``n x m``.
+
+    Each coarse cell covers a 2x2 block; the block is widened by ``radius``
+    cells in both directions. Rows are 1-based as in ``banded_cost``.
+    """
+    coarse = np.asarray(path)
+    lo = np.full(n + 2 * radius, m)
+    hi = np.full(n + 2 * radius, -1)
+    for di in (0, 1):
+        rows = 2 * coarse[:, 0] + di + radius
+        np.minimum.at(lo, rows, 2 * coarse[:, 1])
+        np.maximum.at(hi, rows, 2 * coarse[:, 1] + 1)
+    span = np.lib.stride_tricks.sliding_window_view
+    lo = span(lo, 2 * radius + 1).min(axis=1)[:n]
+    hi = span(hi, 2 * radius + 1).max(axis=1)[:n]
+    lo = np.clip(lo - radius, 0, m - 1) + 1
+    hi = np.clip(hi + radius, 0, m - 1) + 2
+    return np.concatenate([[1], lo]), np.concatenate([[m + 1], hi])
+
+
+def fast_dtw_path(
+    x: np.ndarray,
+    y: np.ndarray,
+    radius: int,
+    base_cells: int = EXACT_DTW_MAX_CELLS
+) -> List[Tuple[int, int]]:
+    n, m = len(x), len(y)
+    # Stop halving while exact DTW is still affordable: going coarser than
+    # needed only aliases fast, repetitive movements
+    if n * m <= base_cells or min(n, m) <= 2 * (radius + 2):
+        cost = accumulated_cost(x, y)
+        return backtrack(cost, int(np.argmin(cost[-1])))
+    coarse_path = fast_dtw_path(coarsen(x), coarsen(y), radius, base_cells)
+    lo, hi = path_window(coarse_path, n, m, radius)
+    cost = banded_cost(x, y, lo, hi)
+    end_lo, end_row = cost.last_row()
+    return backtrack(cost, end_lo + int(np.argmin(end_row)))
+
+
+def fast_dtw_mapping(
+    seq1: List[Optional[float]],
+    seq2: List[Optional[float]],
+    radius: int = FASTDTW_RADIUS,
+    base_cells: int = EXACT_DTW_MAX_CELLS
+) -> List[Tuple[int, int]]:
+    """Approximate ``compute_dtw_mapping`` in O((n + m) * radius).
+
+    The series are repeatedly halved, aligned exactly at the coarsest level,
+    and the path is projected up one level at a time and refined inside a
+    window of ``radius`` cells around it. Same open-begin/open-end semantics
+    as the exact version.
+
+    Halving stops once the pair fits in ``base_cells``, so the coarsest
+    level is solved exactly and is still fine enough to resolve each
+    repetition of the movement.
+
+    Expected error (``bench_dtw --fast`` on noisy, tempo-warped synthetic
+    angle curves of 4k-14k frames, one or two halvings): with radius 30 the
+    path cost equalled the exact optimum in every run. With radius 10, one
+    run in twelve was 15-30% worse. The failure mode is the open begin/end:
+    a coarse level can lock onto a neighbouring repetition of a periodic
+    movement, which shifts the whole path by one cycle. More halvings make
+    this more likely.
+    """
+    return fast_dtw_path(z_normalize(clean(seq1)), z_normalize(clean(seq2)), radius, base_cells)
+
+
+def dtw_path(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_cells: int = EXACT_DTW_MAX_CELLS,
+    use_cache: bool = True,
+    constraint: Optional[str] = None,
+    band_width: Optional[int] = None,
+    max_slope: float = 2.0
+) -> List[Tuple[int, int]]:
+    """Full matrix for clips, checkpointed exact DTW for long clips,
+    multiresolution DTW for whole sessions.
+
+    With a ``constraint`` (see ``compute_dtw_mapping``) only the cells in the
+    band are computed, as long as they fit the ``max_cells`` budget and the
+    band holds a complete path; otherwise the choice above applies.
+
+    Paths are memoized in ``dtw_cache`` under a hash of the prepared
+    (cleaned, normalized, weighted) arrays and every parameter that can
+    change the result. Re-submitted clips and repeated comparisons therefore
+    skip alignment entirely.
+    """
+    options = (max_cells, constraint, band_width, max_slope)
+    if not use_cache:
+        return compute_dtw_path(x, y, *options)
+    key = make_key("dtw", array_digest(x, y), *options, LINEAR_DTW_MAX_CELLS, FASTDTW_RADIUS)
+    cached = dtw_cache.load_arrays(key)
+    if cached is not None:
+        return [tuple(step) for step in cached["path"].tolist()]
+    path = compute_dtw_path(x, y, *options)
+    dtw_cache.store_arrays(key, {"path": np.asarray(path, dtype=np.int32).reshape(-1, 2)})
+    return path
+
+
+def compute_dtw_path(
+    x: np.ndarray,
+    y: np.ndarray,
+    max_cells: int,
+    constraint: Optional[str] = None,
+    band_width: Optional[int] = None,
+    max_slope: float = 2.0
+) -> List[Tuple[int, int]]:
+    n, m = len(x), len(y)
+    if constraint is not None and n and m:
+        lo, hi = constraint_window(n, m, constraint, band_width, max_slope)
+        if n * int(np.max(hi[1:] - lo[1:])) <= max_cells:
+            path = constrained_path(x, y, lo, hi)
+            if path is not None:
+                return path
+    cells = n * m
+    if cells <= max_cells:
+        cost = accumulated_cost(x, y)
+        return backtrack(cost, int(np.argmin(cost[-1])))
+    if cells <= LINEAR_DTW_MAX_CELLS:
+        return linear_memory_path(x, y)
+    return fast_dtw_path(x, y, FASTDTW_RADIUS, max_cells)
+
+
+def align_joint_angles(
+    angles1: Dict[str, List[Optional[float]]],
+    angles2: Dict[str, List[Optional[float]]],
+    joints: List,
+    weights: Optional[Dict] = None,
+    max_cells: int = EXACT_DTW_MAX_CELLS,
+    constraint: Optional[str] = None,
+    band_width: Optional[int] = None
+) -> List[Tuple[int, int]]:
+    """One warping path for all ``joints`` at once (multivariate DTW).
+
+    The local cost is the weighted mean of per-joint L1 distances (see
+    ``prepare_angle_matrix``), so the whole movement is aligned in a single
+    pass instead of once per joint. ``constraint`` and ``band_width`` limit
+    the warp as in ``compute_dtw_mapping``.
+    """
+    x = prepare_angle_matrix(angles1, joints, weights)
+    y = prepare_angle_matrix(angles2, joints, weights)
+    return dtw_path(x, y, max_cells, constraint=constraint, band_width=band_width)
+
+
+def remap_by_dtw(
+    mapping: List[Tuple[int, int]],
+    values: np.ndarray,
+    target_len: int
+) -> np.ndarray:
+    """Average the samples of ``values`` that the path maps onto each target frame.
+
+    ``values`` is one series ``(frames,)`` or a matrix ``(frames, joints)``;
+    None/NaN samples are ignored. Grouped sums and counts come from a single
+    ``np.bincount`` each. Target frames with nothing mapped are NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    src, dst = np.asarray(mapping, dtype=np.intp).reshape(-1, 2).T
+    picked = values[src]
+    width = 1 if picked.ndim == 1 else picked.shape[1]
+    groups = dst if picked.ndim == 1 else (dst[:, np.newaxis] * width + np.arange(width))
+    valid = ~np.isnan(picked)
+    size = target_len * width
+    sums = np.bincount(groups.ravel(), weights=np.where(valid, picked, 0.0).ravel(), minlength=size)
+    counts = np.bincount(groups.ravel(), weights=valid.ravel(), minlength=size)
+    means = np.divide(sums, counts, out=np.full(size, np.nan), where=counts > 0)
+    return means if values.ndim == 1 else means.reshape(target_len, width)
+
+
+def to_optional_list(values: np.ndarray) -> List[Optional[float]]:
+    return [None if np.isnan(v) else float(v) for v in values]
+
+
+def remap_sequence_by_dtw(
+    mapping: List[Tuple[int, int]],
+    seq: List[Optional[float]],
+    target_len: int
+) -> List[Optional[float]]:
+    return to_optional_list(remap_by_dtw(mapping, np.array(seq, dtype=np.float64), target_len))
+
+
+def remap_multiple_by_dtw(
+    mapping: List[Tuple[int, int]],
+    angles: Dict[str, List[Optional[float]]],
+    target_len: int
+) -> Dict[str, List[Optional[float]]]:
+    """Remap every series in ``angles`` along one shared path in one pass."""
+    joints = list(angles)
+    if not joints:
+        return {}
+    matrix = np.array([angles[joint] for joint in joints], dtype=np.float64).T
+    remapped = remap_by_dtw(mapping, matrix, target_len)
+    return {joint: to_optional_list(remapped[:, k]) for k, joint in enumerate(joints)}
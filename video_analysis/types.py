@@ -1,72 +1,166 @@
-# utils/types.py
-from dataclasses import dataclass
-from typing import List, Optional
-from enum import Enum
-
-@dataclass
-class Point3D:
-    x: float
-    y: float
-    z: float
-
-@dataclass
-class Pose:
-    keypoints: List[Optional[Point3D]]  # None if undetected
-
-@dataclass
-class Frame:
-    time: float  # seconds
-    pose: Pose
-
-class Joint(str, Enum):
-    RIGHT_ELBOW = "right_elbow"
-    LEFT_ELBOW = "left_elbow"
-    RIGHT_KNEE = "right_knee"
-    LEFT_KNEE = "left_knee"
-    RIGHT_SHOULDER = "right_shoulder"
-    LEFT_SHOULDER = "left_shoulder"
-    RIGHT_HIP = "right_hip"
-    LEFT_HIP = "left_hip"
-    RIGHT_ANKLE = "right_ankle"
-    LEFT_ANKLE = "left_ankle"
-    RIGHT_WRIST = "right_wrist"
-    LEFT_WRIST = "left_wrist"
-
-    @classmethod
-    def list(cls):
-        return list(map(lambda j: j.value, cls))
-
-    @property
-    def landmark_indices(self) -> Optional[List[int]]:
-        return {
-            Joint.RIGHT_ELBOW: [12, 14, 16],
-            Joint.LEFT_ELBOW: [11, 13, 15],
-            Joint.RIGHT_KNEE: [24, 26, 28],
-            Joint.LEFT_KNEE: [23, 25, 27],
-            Joint.RIGHT_SHOULDER: [14, 12, 24],
-            Joint.LEFT_SHOULDER: [13, 11, 23],
-            Joint.RIGHT_HIP: [12, 24, 26],
-            Joint.LEFT_HIP: [11, 23, 25],
-            Joint.RIGHT_ANKLE: [26, 28, 32],
-            Joint.LEFT_ANKLE: [25, 27, 31],
-            Joint.RIGHT_WRIST: [14, 16, 22],
-            Joint.LEFT_WRIST: [13, 15, 21],
-        }.get(self, None)
-
-    def label(self) -> str:
-        return JOINT_LABELS[self.value]
-
-JOINT_LABELS = {
-    "right_elbow": "Right Elbow",
-    "left_elbow": "Left Elbow",
-    "right_knee": "Right Knee",
-    "left_knee": "Left Knee",
-    "right_shoulder": "Right Shoulder",
-    "left_shoulder": "Left Shoulder",
-    "right_hip": "Right Hip",
-    "left_hip": "Left Hip",
-    "right_ankle": "Right Ankle",
-    "left_ankle": "Left Ankle",
-    "right_wrist": "Right Wrist",
-    "left_wrist": "Left Wrist",
+# utils/types.py
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+from enum import Enum
+
+import numpy as np
+
+NUM_LANDMARKS = 33
+LANDMARK_FIELDS = 4  # x, y, z, visibility
+
+@dataclass
+class Point3D:
+    x: float
+    y: float
+    z: float
+
+@dataclass
+class Pose:
+    keypoints: List[Optional[Point3D]]  # None if undetected
+
+@dataclass
+class Frame:
+    time: float  # seconds
+    pose: Pose
+
+@dataclass
+class PoseSequence:
+    """Array-backed poses for a whole video.
+
+    ``landmarks`` is a float32 ``(frames, 33, 4)`` array of x/y/z/visibility,
+    ``detected`` a per-frame bool mask and ``times`` the frame timestamps in
+    seconds. Integer indexing and iteration give ``Frame`` objects for older
+    consumers; slicing returns a ``PoseSequence`` of views, never a copy.
+    ``metrics`` carries extraction counters and is None for cached poses.
+    """
+    landmarks: np.ndarray
+    detected: np.ndarray
+    times: np.ndarray
+    metrics: Optional[Dict[str, float]] = None
+
+    @classmethod
+    def empty(cls) -> "PoseSequence":
+        return cls(
+            landmarks=np.zeros((0, NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32),
+            detected=np.zeros(0, dtype=bool),
+            times=np.zeros(0, dtype=np.float64),
+        )
+
+    @classmethod
+    def from_frames(cls, frames: Sequence[Frame]) -> "PoseSequence":
+        seq = cls.empty()
+        if not frames:
+            return seq
+        landmarks = np.zeros((len(frames), NUM_LANDMARKS, LANDMARK_FIELDS), dtype=np.float32)
+        detected = np.zeros(len(frames), dtype=bool)
+        for f, frame in enumerate(frames):
+            keypoints = frame.pose.keypoints
+            if all(kp is not None for kp in keypoints):
+                landmarks[f, :, :3] = [(kp.x, kp.y, kp.z) for kp in keypoints]
+                landmarks[f, :, 3] = 1.0
+                detected[f] = True
+        times = np.array([frame.time for frame in frames], dtype=np.float64)
+        return cls(landmarks=landmarks, detected=detected, times=times)
+
+    @staticmethod
+    def concatenate(sequences: Sequence["PoseSequence"]) -> "PoseSequence":
+        if not sequences:
+            return PoseSequence.empty()
+        metrics = None
+        measured = [s.metrics for s in sequences if s.metrics is not None]
+        if measured:
+            metrics = {key: sum(m.get(key, 0) for m in measured) for key in measured[0]}
+        return PoseSequence(
+            landmarks=np.concatenate([s.landmarks for s in sequences]),
+            detected=np.concatenate([s.detected for s in sequences]),
+            times=np.concatenate([s.times for s in sequences]),
+            metrics=metrics,
+        )
+
+    @property
+    def xyz(self) -> np.ndarray:
+        return self.landmarks[..., :3]
+
+    @property
+    def visibility(self) -> np.ndarray:
+        return self.landmarks[..., 3]
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Frame, "PoseSequence"]:
+        if isinstance(index, slice):
+            return PoseSequence(
+                landmarks=self.landmarks[index],
+                detected=self.detected[index],
+                times=self.times[index],
+            )
+        return self.frame(index)
+
+    def __iter__(self) -> Iterator[Frame]:
+        for i in range(len(self)):
+            yield self.frame(i)
+
+    def frame(self, index: int) -> Frame:
+        if self.detected[index]:
+            keypoints = [Point3D(float(x), float(y), float(z)) for x, y, z in self.xyz[index]]
+        else:
+            keypoints = [None] * NUM_LANDMARKS
+        return Frame(time=float(self.times[index]), pose=Pose(keypoints=keypoints))
+
+class Joint(str, Enum):
+    RIGHT_ELBOW = "right_elbow"
+    LEFT_ELBOW = "left_elbow"
+    RIGHT_KNEE = "right_knee"
+    LEFT_KNEE = "left_knee"
+    RIGHT_SHOULDER = "right_shoulder"
+    LEFT_SHOULDER = "left_shoulder"
+    RIGHT_HIP = "right_hip"
+    LEFT_HIP = "left_hip"
+    RIGHT_ANKLE = "right_ankle"
+    LEFT_ANKLE = "left_ankle"
+    RIGHT_WRIST = "right_wrist"
+    LEFT_WRIST = "left_wrist"
+
+    @classmethod
+    def list(cls):
+        return list(map(lambda j: j.value, cls))
+
+    @property
+    def landmark_indices(self) -> Optional[List[int]]:
+        return JOINT_LANDMARKS.get(self.value)
+
+    def label(self) -> str:
+        return JOINT_LABELS[self.value]
+
+# MediaPipe landmark indices per joint: (proximal, vertex, distal). This is the
+# single definition table; video_analysis.joints compiles it for the angle code.
+JOINT_LANDMARKS = {
+    "right_elbow": [12, 14, 16],
+    "left_elbow": [11, 13, 15],
+    "right_knee": [24, 26, 28],
+    "left_knee": [23, 25, 27],
+    "right_shoulder": [14, 12, 24],
+    "left_shoulder": [13, 11, 23],
+    "right_hip": [12, 24, 26],
+    "left_hip": [11, 23, 25],
+    "right_ankle": [26, 28, 32],
+    "left_ankle": [25, 27, 31],
+    "right_wrist": [14, 16, 22],
+    "left_wrist": [13, 15, 21],
+}
+
+JOINT_LABELS = {
+    "right_elbow": "Right Elbow",
+    "left_elbow": "Left Elbow",
+    "right_knee": "Right Knee",
+    "left_knee": "Left Knee",
+    "right_shoulder": "Right Shoulder",
+    "left_shoulder": "Left Shoulder",
+    "right_hip": "Right Hip",
+    "left_hip": "Left Hip",
+    "right_ankle": "Right Ankle",
+    "left_ankle": "Left Ankle",
+    "right_wrist": "Right Wrist",
+    "left_wrist": "Left Wrist",
 }
\ No newline at end of file